@@ -0,0 +1,22 @@
+import queue
+from types import SimpleNamespace
+
+from yell import Yell
+from yell.Aggregator import Aggregator
+
+
+def test_merge_keeps_the_workers_nesting():
+    worker = Yell()
+    sent = queue.Queue()
+    worker.attach(sent)
+    try:
+        worker("top level")
+        with worker.nested(2):
+            worker("two deeper")
+    finally:
+        worker.detach()
+    top, nested = sent.get_nowait(), sent.get_nowait()
+    parent = SimpleNamespace(yell=Yell())
+    Aggregator.merge(parent, top)
+    Aggregator.merge(parent, nested)
+    assert nested.lvl == top.lvl + 2
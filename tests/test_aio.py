@@ -0,0 +1,35 @@
+import asyncio
+import io
+import queue
+
+from yell import Yell
+
+
+def test_attached_worker_forwards_async_calls():
+    yell = Yell()
+    sent = queue.Queue()
+    out = io.StringIO()
+    yell.attach(sent)
+
+    async def main():
+        await yell.aio.info("from a task", file=out)
+        await yell.aio.flush()
+
+    try:
+        asyncio.run(main())
+    finally:
+        yell.detach()
+    assert sent.get_nowait().args == ("from a task",)
+    assert out.getvalue() == ""
+
+
+def test_async_calls_render_locally_otherwise():
+    yell = Yell()
+    out = io.StringIO()
+
+    async def main():
+        await yell.aio.info("from a task", file=out)
+        await yell.aio.flush()
+
+    asyncio.run(main())
+    assert "from a task" in out.getvalue()
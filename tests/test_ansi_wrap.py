@@ -0,0 +1,45 @@
+import random
+import re
+
+import pytest
+
+from yell.AnsiWrap import AnsiWrap, text_width
+
+wrapper = AnsiWrap()
+escape = re.compile(r"\033\[[0-9;]*[a-zA-Z]")
+
+
+def _visible(line):
+    return escape.sub("", line)
+
+
+@pytest.mark.parametrize("text", ["日本語", "é日本語", "x 日本語", "日abc 日x"])
+@pytest.mark.parametrize("width", [1, 3, 4])
+@pytest.mark.parametrize("indent", ["", " ↪ "])
+def test_wide_characters_without_room_still_make_progress(text, width, indent):
+    lines = wrapper.wrap(text, width, subsequent_indent=indent)
+    assert len(lines) <= len(text)
+    body = "".join(_visible(line)[len(indent):] if i else _visible(line) for i, line in enumerate(lines))
+    assert body.replace(" ", "") == text.replace(" ", "")
+    # a character wider than the room next to the indent is the only thing on its line
+    for line in lines[1:]:
+        assert text_width(_visible(line)) <= max(width, text_width(indent) + 2)
+
+
+def test_break_at_space_after_a_differently_indented_first_line():
+    text = "é \x1b[31mé😀hellohello\x1b[0mbb😀a"
+    lines = wrapper.wrap(text, 19, subsequent_indent=" ↪ ")
+    assert [wrapper.visible_width(line) for line in lines] == [19, 4]
+
+
+def test_lines_never_exceed_the_width():
+    rng = random.Random(1234)
+    pieces = ["a", "b", "hello", " ", " ", "é", "日", "😀", "é", "\x1b[31m", "\x1b[1m", "\x1b[0m"]
+    for _ in range(5_000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 40)))
+        width = rng.randint(5, 40)
+        lines = wrapper.wrap(text, width, subsequent_indent=" ↪ ")
+        for line in lines:
+            assert wrapper.visible_width(line) <= width, (text, width, lines)
+        body = "".join(_visible(line)[3:] if i else _visible(line) for i, line in enumerate(lines))
+        assert body.replace(" ", "") == _visible(text).replace(" ", "")
@@ -0,0 +1,34 @@
+import pytest
+
+import yell as package
+from yell import Yell
+from yell.BinaryLog import BinaryLog
+from yell.__main__ import main
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = str(tmp_path / "app.yellbin")
+    yell = Yell()
+    log = BinaryLog(path)
+    for module in ("pkg.utils", "pkg.db.models", "other.thing"):
+        record = yell.capture("info", (f"from {module}",), {})
+        record.module = module
+        log.write(record)
+    log.close()
+    yield path
+    # --json switches the package's instance over
+    package.yell.format = "pretty"
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("utils", ["pkg.utils"]),
+    ("pkg.*", ["pkg.utils", "pkg.db.models"]),
+    ("pkg.*.models", ["pkg.db.models"]),
+    ("other.thing", ["other.thing"]),
+    ("pkg", []),
+])
+def test_module_filter_matches_like_the_config(log_file, capsys, pattern, expected):
+    main(["render", log_file, "--module", pattern, "--json"])
+    out = capsys.readouterr().out
+    assert [module for module in ("pkg.utils", "pkg.db.models", "other.thing") if f"from {module}" in out] == expected
@@ -0,0 +1,54 @@
+import sys
+import types
+
+import pytest
+
+from yell import Yell
+from yell.Levels import Levels
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """A yell_config.py in the working directory whose ``config`` the test fills in."""
+    (tmp_path / "yell_config.py").write_text("config = {}\n")
+    monkeypatch.chdir(tmp_path)
+    module = types.ModuleType("yell_config")
+    module.config = {}
+    monkeypatch.setitem(sys.modules, "yell_config", module)
+    return module
+
+
+class _Breaks(dict):
+    """A config that raises while it's read, until ``fixed`` is set."""
+    fixed = False
+
+    def get(self, key, default=None):
+        if not self.fixed:
+            raise RuntimeError("broken config")
+        return super().get(key, default)
+
+
+def test_reading_settings_loads_the_config_first(config):
+    config.config = {"width": 55, "level": "warning", "all_quiet": True}
+    assert Yell().width == 55
+    assert Yell().level == Levels.warning
+    assert Yell().all_quiet is True
+
+
+def test_settings_made_in_code_override_the_config(config):
+    config.config = {"width": 55}
+    yell = Yell()
+    yell.width = 70
+    assert yell.width == 70
+
+
+def test_a_failing_config_raises_and_is_retried(config):
+    config.config = _Breaks(width=55)
+    yell = Yell()
+    with pytest.raises(RuntimeError, match="broken config"):
+        yell.info("first call")
+    with pytest.raises(RuntimeError, match="broken config"):
+        yell.level
+    config.config.fixed = True
+    assert yell.width == 55
+    assert yell._configured is True
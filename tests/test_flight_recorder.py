@@ -0,0 +1,92 @@
+import os
+import warnings
+
+import pytest
+
+from yell import Yell
+from yell.FlightRecorder import FlightRecorder
+
+
+def _record(yell, *args):
+    return yell.capture("info", args, {})
+
+
+def test_torn_slot_is_skipped(tmp_path):
+    yell = Yell()
+    path = str(tmp_path / "yell.ring")
+    recorder = FlightRecorder(size=4, path=path, slot_size=1024)
+    for n in range(3):
+        recorder.add(_record(yell, f"message {n}"))
+    # scribble over the middle of the second slot, as a crash mid-write would
+    offset = FlightRecorder.header.size + 1 * 1024 + FlightRecorder.slot_header.size + 20
+    recorder._map[offset:offset + 8] = b"\xff" * 8
+    recorder.close()
+    assert [record.args for record in FlightRecorder.load(path)] == [("message 0",), ("message 2",)]
+
+
+def test_oversized_record_is_shrunk_not_cut(tmp_path):
+    yell = Yell()
+    path = str(tmp_path / "yell.ring")
+    recorder = FlightRecorder(size=2, path=path, slot_size=2048, max_chars=None)
+    recorder.add(_record(yell, "x" * 5_000))
+    recorder.add(_record(yell, "fits"))
+    recorder.close()
+    shrunk, fits = FlightRecorder.load(path)
+    assert "didn't fit" in shrunk.args[0]
+    assert fits.args == ("fits",)
+
+
+def test_a_slot_too_small_for_any_record_is_left_empty(tmp_path):
+    yell = Yell()
+    path = str(tmp_path / "yell.ring")
+    recorder = FlightRecorder(size=2, path=path, slot_size=64)
+    recorder.add(_record(yell, "hello"))
+    assert recorder.records() == []
+    recorder.close()
+    assert FlightRecorder.load(path) == []
+
+
+def test_records_async_calls_under_all_quiet(tmp_path):
+    import asyncio
+    import io
+    yell = Yell()
+    yell.all_quiet = True
+    yell.enable_flight_recorder(size=10, on_crash=False, dump_signal=None)
+    out = io.StringIO()
+
+    async def main():
+        await yell.aio.info("async and quiet", file=out)
+
+    try:
+        asyncio.run(main())
+        yell.info("sync and quiet", file=out)
+        assert [record.args for record in yell.recorder.records()] == [("async and quiet",), ("sync and quiet",)]
+        assert out.getvalue() == ""
+    finally:
+        yell.disable_flight_recorder()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_keeps_its_own_ring(tmp_path):
+    yell = Yell()
+    path = str(tmp_path / "yell.ring")
+    yell.all_quiet = True
+    yell.enable_flight_recorder(size=4, path=path, on_crash=False, dump_signal=None)
+    try:
+        yell.info("parent before")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            pid = os.fork()
+        if pid == 0:
+            try:
+                yell.info("child")
+                yell.recorder.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        yell.info("parent after")
+        yell.recorder.close()
+        assert [record.args for record in FlightRecorder.load(path)] == [("parent before",), ("parent after",)]
+        assert [record.args for record in FlightRecorder.load(f"{path}.{pid}")] == [("child",)]
+    finally:
+        yell.disable_flight_recorder()
@@ -0,0 +1,7 @@
+from yell import bench
+
+
+def test_import_stays_within_budget_and_defers_heavy_modules():
+    ns, loaded = bench.import_time(repeat=3)
+    assert loaded == []
+    assert ns <= bench.IMPORT_BUDGET_MS * 1_000_000, f"import yell took {ns / 1e6:.1f} ms"
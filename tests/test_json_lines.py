@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from yell import Yell
+from yell.JsonLines import JsonLines
+
+np = pytest.importorskip("numpy")
+
+
+def _values():
+    values = [np.arange(2_000_000.0), np.float64(1.5), np.arange(6).reshape(2, 3)]
+    try:
+        import pandas
+    except ImportError:
+        return values
+    return values + [pandas.DataFrame({"a": range(1_000), "b": [0.5] * 1_000})]
+
+
+def test_orjson_and_json_write_the_same_summaries():
+    pytest.importorskip("orjson")
+    yell = Yell()
+    record = yell.capture("info", ("arrays", *_values()), {})
+    fast, plain = JsonLines(use_orjson=True), JsonLines(use_orjson=False)
+    assert fast.encoder == "orjson"
+    fast_line, plain_line = fast.line(record), plain.line(record)
+    assert json.loads(fast_line) == json.loads(plain_line)
+    # arrays go through ArraySummary, not out in full
+    assert len(fast_line) < 10_000
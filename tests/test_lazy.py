@@ -0,0 +1,44 @@
+import io
+
+from yell import Yell
+from yell.Lazy import Lazy
+
+
+def _named(x=1):
+    return x
+
+
+def test_only_lazy_and_bare_lambdas_are_deferred():
+    assert Lazy.is_deferred(Lazy(len, "abc"))
+    assert Lazy.is_deferred(lambda: 1)
+    assert not Lazy.is_deferred(lambda x: x)
+    assert not Lazy.is_deferred(lambda x=1: x)
+    assert not Lazy.is_deferred(_named)
+    assert not Lazy.is_deferred(len)
+    assert not Lazy.is_deferred(dict)
+    assert not Lazy.is_deferred("<lambda>")
+
+
+def test_resolve_works_out_deferred_values_in_place():
+    values = ("a", 1, _named)
+    assert Lazy.resolve(values) is values
+    assert Lazy.resolve(("a", lambda: 2, Lazy(sorted, [3, 1], reverse=True), _named)) == ("a", 2, [3, 1], _named)
+
+
+def test_an_exception_is_shown_in_place_of_the_value():
+    def broken():
+        raise KeyError("missing")
+
+    (shown,) = Lazy.resolve((Lazy(broken),))
+    assert shown == "<Lazy('test_an_exception_is_shown_in_place_of_the_value.<locals>.broken') raised KeyError: 'missing'>"
+
+
+def test_a_call_that_is_turned_off_never_works_it_out(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    yell, out, calls = Yell(), io.StringIO(), []
+    yell.level = "warning"
+    yell.debug("state", Lazy(calls.append, "debug"), file=out)
+    assert calls == []
+    yell.warning("state", lambda: calls.append("warning") or "worked out", file=out)
+    assert calls == ["warning"]
+    assert "worked out" in out.getvalue()
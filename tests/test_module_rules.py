@@ -0,0 +1,33 @@
+import importlib
+import io
+import re
+
+from yell.ModuleRules import ModuleRules
+
+
+def test_most_specific_rule_wins():
+    rules = ModuleRules()
+    for pattern, lvl in [("utils", 1), ("myapp.db", 2), ("myapp.db.*", 3), ("myapp.*.models", 4),
+                         ("myapp.db.models", 5)]:
+        rules.add(pattern, {"lvl": lvl})
+    assert rules.match("other.utils") == {"lvl": 1}
+    assert rules.match("myapp.db") == {"lvl": 2}
+    assert rules.match("myapp.db.utils") == {"lvl": 3}
+    assert rules.match("myapp.api.models") == {"lvl": 4}
+    assert rules.match("myapp.db.models") == {"lvl": 5}
+    assert rules.match("myapp") is None
+
+
+def test_header_shows_the_file_not_the_dotted_name(tmp_path, monkeypatch):
+    package = tmp_path / "pkg" / "sub"
+    package.mkdir(parents=True)
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (package / "__init__.py").write_text("")
+    (package / "utils.py").write_text("from yell import Yell\nyell = Yell()\ndef shout(out):\n    yell('hi', file=out)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    utils = importlib.import_module("pkg.sub.utils")
+    out = io.StringIO()
+    utils.shout(out)
+    header = re.sub(r"\033\[[0-9;]*m", "", out.getvalue())
+    assert " utils.py  ->  shout(): 1 " in header
+    assert "pkg.sub.utils.py" not in header
@@ -0,0 +1,43 @@
+import pickle
+import queue
+
+from yell import Yell
+from yell.Record import to_portable
+
+
+class _Unprintable:
+    def __str__(self):
+        raise ValueError("no")
+
+
+def test_cycles_become_markers():
+    items = [1]
+    items.append(items)
+    table = {"items": items}
+    table["self"] = table
+    assert to_portable(items) == [1, "[…cycle]"]
+    assert to_portable(table) == {"items": [1, "[…cycle]"], "self": "{…cycle}"}
+    # the same container twice, side by side, isn't a cycle
+    shared = [1]
+    assert to_portable((shared, shared)) == ([1], [1])
+
+
+def test_a_broken_str_falls_back_to_repr():
+    assert to_portable([_Unprintable()])[0].startswith("<test_portable._Unprintable object")
+
+
+def test_forwarded_cyclic_payload_does_not_raise():
+    yell = Yell()
+    sent = queue.Queue()
+    yell.attach(sent)
+    try:
+        cyclic = {"name": "loop"}
+        cyclic["again"] = cyclic
+        yell("cyclic payload", cyclic)
+        yell("long payload", "x" * 100_000, list(range(10_000)))
+    finally:
+        yell.detach()
+    first, second = sent.get_nowait(), sent.get_nowait()
+    assert first.args == ("cyclic payload", {"name": "loop", "again": "{…cycle}"})
+    assert len(second.args[1]) <= 10_003 and len(second.args[2]) == 1_001
+    pickle.dumps(first)
@@ -0,0 +1,95 @@
+import io
+import re
+import sys
+import types
+
+import pytest
+
+from yell import Yell
+from yell.RateLimit import RateLimit
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    """A yell_config.py whose ``modules`` the test fills in."""
+    (tmp_path / "yell_config.py").write_text("config = {}\n")
+    monkeypatch.chdir(tmp_path)
+    module = types.ModuleType("yell_config")
+    module.config = {"modules": {}}
+    monkeypatch.setitem(sys.modules, "yell_config", module)
+    return module.config["modules"]
+
+
+def _shown(out) -> int:
+    return out.getvalue().count("tick")
+
+
+def test_token_bucket_allows_bursts_then_refills_at_the_rate():
+    limit = RateLimit(rate=2, burst=3)
+    start = limit.refilled
+    assert [limit.allow(start) for _ in range(4)] == [True, True, True, False]
+    assert [limit.allow(start + 0.5) for _ in range(2)] == [True, False]
+    # a long pause refills no further than the burst
+    assert [limit.allow(start + 60) for _ in range(4)] == [True, True, True, False]
+    assert limit.take_suppressed() == 3
+    assert limit.take_suppressed() == 0
+
+
+def test_sample_and_first():
+    sample = RateLimit(sample=3)
+    assert [sample.allow() for _ in range(7)] == [True, False, False, True, False, False, True]
+    first = RateLimit(first=2)
+    assert [first.allow() for _ in range(5)] == [True, True, False, False, False]
+    both = RateLimit(sample=2, first=5)
+    assert [both.allow() for _ in range(8)] == [True, False, True, False, True, False, False, False]
+    assert both.describe() == "first 5, 1 in 2"
+
+
+def test_module_limits_apply_per_call_site(modules):
+    modules["test_rate_limit"] = {"first": 2}
+    yell, out = Yell(), io.StringIO()
+    for _ in range(5):
+        yell("tick", file=out)
+    assert _shown(out) == 2
+    for _ in range(5):
+        yell("tick", file=out)
+    assert _shown(out) == 4
+
+
+def test_per_call_options_override_the_module(modules):
+    modules["test_rate_limit"] = {"first": 2}
+    yell, out = Yell(), io.StringIO()
+    for _ in range(5):
+        yell("tick", first=4, file=out)
+    assert _shown(out) == 4
+    out = io.StringIO()
+    for _ in range(5):
+        yell("tick", sample=2, file=out)
+    # sample adds to the module's first=2 rather than replacing it: only call 0 passes both
+    assert _shown(out) == 1
+
+
+def test_suppressed_calls_are_summarized(monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(tmp_path)
+    yell, out = Yell(), io.StringIO()
+
+    def poll():
+        for _ in range(5):
+            yell("tick", first=1, file=out)
+
+    poll()
+    yell.report_suppressed()
+    summary = re.sub(r"\033\[[0-9;]*m", "", capsys.readouterr().out)
+    assert re.search(r"yell: suppressed 4 calls from test_rate_limit\.py:\d+ poll\(\) \(first 1\)", summary)
+    yell.report_suppressed()
+    assert capsys.readouterr().out == ""
+
+
+def test_summary_is_written_every_interval(monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(tmp_path)
+    yell, out = Yell(), io.StringIO()
+    yell.limit_summary_interval = 0
+    for _ in range(3):
+        yell("tick", first=1, file=out)
+    # each call reports what the calls before it dropped
+    assert capsys.readouterr().out.count("yell: suppressed 1 calls") == 1
@@ -0,0 +1,34 @@
+import time
+
+from yell import Yell
+from yell.RepeatCollapser import RepeatCollapser
+
+
+def _records(yell, count):
+    return [yell.capture("info", ("same again",), {}) for _ in range(count)]
+
+
+def test_summary_arrives_when_the_window_is_up_without_another_message():
+    yell = Yell()
+    emitted = []
+    collapser = RepeatCollapser(emitted.append, window=0.2)
+    held = [collapser.offer(record) for record in _records(yell, 4)]
+    assert held == [False, True, True, True]
+    assert emitted == []
+    deadline = time.monotonic() + 5
+    while not emitted and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(emitted) == 1
+    assert emitted[0].args[0].startswith("repeated 3 times")
+
+
+def test_flush_reports_and_stops_the_timer():
+    yell = Yell()
+    emitted = []
+    collapser = RepeatCollapser(emitted.append, window=0.2)
+    for record in _records(yell, 3):
+        collapser.offer(record)
+    collapser.flush()
+    assert len(emitted) == 1
+    time.sleep(0.4)
+    assert len(emitted) == 1
@@ -0,0 +1,52 @@
+import io
+import json
+
+from yell import Yell
+
+
+def _logged(yell):
+    out = io.StringIO()
+    yell.info("hello", file=out)
+    yell("hello", file=out)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_stats_keep_the_call_site():
+    yell = Yell()
+    yell.format = "json"
+    before = _logged(yell)
+    yell.enable_stats()
+    during = _logged(yell)
+    yell.disable_stats()
+    after = _logged(yell)
+
+    def site(entry):
+        return entry["module"], entry["function"], entry["line"], entry["stack"]
+
+    assert [site(entry) for entry in during] == [site(entry) for entry in before]
+    assert [site(entry) for entry in after] == [site(entry) for entry in before]
+    assert before[0]["module"] == "test_self_stats"
+    assert before[0]["function"] == "_logged"
+    assert yell.stats() == {}
+
+
+def test_stats_count_the_capture_phase():
+    yell = Yell()
+    yell.format = "json"
+    yell.enable_stats()
+    _logged(yell)
+    assert yell.stats()["capture"]["calls"] == 2
+
+
+def test_short_lived_threads_dont_pile_up_totals():
+    import threading
+    yell = Yell()
+    yell.format = "json"
+    stats = yell.enable_stats()
+    out = io.StringIO()
+    for _ in range(300):
+        thread = threading.Thread(target=yell.info, args=("hello",), kwargs={"file": out})
+        thread.start()
+        thread.join()
+    assert yell.stats()["capture"]["calls"] == 300
+    assert len(stats._shards) < 50
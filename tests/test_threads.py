@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+import warnings
+
+import pytest
+
+from yell import Yell
+from yell import bench
+
+
+def test_concurrent_writers_never_interleave_messages():
+    assert bench.bench_threads(threads=16, calls=50)["ok"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_while_another_thread_holds_the_write_lock():
+    from yell.Yell import _write_lock
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with _write_lock:
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait()
+    try:
+        with warnings.catch_warnings():
+            # forking with other threads running is the point of the test
+            warnings.simplefilter("ignore", DeprecationWarning)
+            pid = os.fork()
+        if pid == 0:
+            with open(os.devnull, "w") as devnull:
+                Yell().info("from the child", file=devnull)
+            os._exit(0)
+        deadline = time.monotonic() + 10
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, 9)
+                os.waitpid(pid, 0)
+                pytest.fail("the child deadlocked on the write lock")
+            time.sleep(0.01)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+    finally:
+        release.set()
+        thread.join()
@@ -0,0 +1,48 @@
+import threading
+
+from yell import Yell
+from yell.Timings import Timings
+
+
+def test_threads_are_merged_in_the_summary():
+    timings = Timings()
+
+    def work(ns):
+        for _ in range(2_000):
+            timings.add("step", ns)
+
+    threads = [threading.Thread(target=work, args=(ns,)) for ns in (100, 100, 100, 10_000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    step = timings.summary()["step"]
+    assert step["calls"] == 8_000
+    assert step["total_ns"] == 2_000 * (3 * 100 + 10_000)
+    assert (step["min_ns"], step["max_ns"]) == (100, 10_000)
+    # a quarter of the calls took 10,000 ns, so the p95 is one of them
+    assert step["p95_ns"] == 10_000
+    timings.clear()
+    assert timings.summary() == {}
+
+
+def test_quiet_timed_records_without_drawing():
+    yell = Yell()
+
+    @yell.timed(show=False)
+    def hot(x):
+        return x * 2
+
+    assert [hot(n) for n in range(5)] == [0, 2, 4, 6, 8]
+    assert yell.timings.summary()["test_quiet_timed_records_without_drawing.<locals>.hot"]["calls"] == 5
+
+
+def test_short_lived_threads_dont_pile_up_shards():
+    timings = Timings()
+    for _ in range(500):
+        thread = threading.Thread(target=timings.add, args=("request", 100))
+        thread.start()
+        thread.join()
+    assert timings.summary()["request"]["calls"] == 500
+    # finished threads' ids are handed out again, and their numbers are carried on with
+    assert len(timings._shards) < 50
@@ -0,0 +1,42 @@
+from yell.StyledText import StyledText
+from yell.TreeRenderer import TreeRenderer
+
+
+def _lines(things, **limits) -> list:
+    renderer = TreeRenderer(StyledText, width=30, **{"max_depth": None, "max_items": None, "max_lines": None, **limits})
+    return [line.plain() for line in renderer.lines(things)]
+
+
+def test_containers_below_max_depth_are_summarised():
+    lines = _lines([{"a": {"b": {"c": 1, "d": 2}, "e": [1, 2, 3]}}], max_depth=2)
+    assert "   |   |- b: {…2 keys}" in lines
+    assert "   |   |- e: […3 items]" in lines
+    assert not any("c: 1" in line for line in lines)
+    assert "   |   |   |- c: 1" in _lines([{"a": {"b": {"c": 1, "d": 2}}}], max_depth=3)
+
+
+def test_only_the_first_max_items_are_shown():
+    lines = _lines([list(range(10))], max_items=3)
+    assert lines[:4] == ["   |- 0", "   |- 1", "   |- 2", "   |- … 7 more"]
+    lines = _lines([{key: key for key in "abcde"}], max_items=4)
+    assert lines[-2] == "   |- … 1 more"
+    assert lines[-1].startswith("   |----")
+    assert len(_lines([list(range(10))], max_items=10)) == 11
+
+
+def test_output_stops_after_max_lines():
+    lines = _lines([list(range(100))], max_lines=5)
+    assert lines == ["   |- 0", "   |- 1", "   |- 2", "   |- 3", "   |- 4", " … stopped after 5 lines"]
+    assert len(_lines([list(range(4))], max_lines=5)) == 5
+
+
+def test_cycles_are_shown_instead_of_followed():
+    looped = {"name": "root"}
+    looped["self"] = looped
+    items = [1]
+    items.append(items)
+    assert "   |- self: {…cycle}" in _lines([looped])
+    assert "   |- […cycle]" in _lines([items])
+    # the same container twice side by side is not a cycle
+    shared = [1]
+    assert _lines([{"x": shared, "y": shared}]).count("   |   |- 1") == 2
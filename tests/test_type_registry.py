@@ -0,0 +1,58 @@
+import numbers
+from decimal import Decimal
+
+import pytest
+
+from yell.TypeRegistry import TypeRegistry
+
+
+class Base:
+    pass
+
+
+class Child(Base):
+    pass
+
+
+class Grandchild(Child):
+    pass
+
+
+def test_the_nearest_class_in_the_mro_wins():
+    types = TypeRegistry()
+    types.register(Base, color="red")
+    types.register(Child, color="blue")
+    assert types.resolve(Grandchild) == ("blue", None)
+    assert types.resolve(Base) == ("red", None)
+    assert types.resolve(str) == (None, None)
+    assert types.render(Grandchild()).segments[0][1] == "blue"
+
+
+def test_abstract_bases_apply_in_registration_order_after_the_mro():
+    types = TypeRegistry()
+    types.register(numbers.Number, color="green")
+    types.register(numbers.Real, color="yellow")
+    assert types.resolve(float) == ("green", None)
+    types.register(Decimal, color="magenta")
+    assert types.resolve(Decimal) == ("magenta", None)
+    types.resolvers.append(lambda kind: ("cyan", None) if kind is str else None)
+    assert types.resolve(str) == ("cyan", None)
+    assert types.resolve(bytes) == (None, None)
+
+
+def test_registering_or_unregistering_clears_the_cache():
+    types = TypeRegistry()
+    types.register(Base, color="red")
+    assert types.render(Child()).segments[0][1] == "red"
+    assert types.cache_info() == {"registered": 1, "resolved": 1}
+    types.register(Child, renderer=lambda value: {"kind": type(value).__name__})
+    assert types.cache_info() == {"registered": 2, "resolved": 0}
+    assert types.render(Child()) == {"kind": "Child"}
+    types.unregister(Child)
+    assert types.cache_info() == {"registered": 1, "resolved": 0}
+    assert types.render(Child()).segments[0][1] == "red"
+
+
+def test_unknown_colors_are_refused():
+    with pytest.raises(ValueError):
+        TypeRegistry().register(Base, color="not a color")
@@ -0,0 +1,157 @@
+import os
+import sys
+import queue
+import threading
+import multiprocessing
+from multiprocessing.connection import Listener, Client
+
+
+class Aggregator:
+    """Collects records from worker processes and writes them from this one.
+
+    Workers send portable ``Record`` copies over a ``multiprocessing`` queue, or over a
+    Unix socket when ``address`` is given. A thread here renders each record and writes
+    it in one piece, so output from different processes never tears. Call counts are
+    merged into this process's ``YellCaller`` registry, which means headers show totals
+    across every worker instead of each worker's own count.
+
+        aggregator = yell.aggregate()
+        with ProcessPoolExecutor(**aggregator.pool_kwargs()) as pool:
+            ...
+        aggregator.close()
+
+    Processes forked after ``aggregate()`` attach themselves automatically; ``pool_kwargs``
+    covers the ``spawn`` and ``forkserver`` start methods. With those, pass the same
+    ``context`` here that the pool uses.
+    """
+    _stop = None
+
+    def __init__(self, yell, address=None, context=None):
+        self.yell = yell
+        self.address = address
+        self.queue = None if address else multiprocessing.get_context(context).Queue()
+        self.received = 0
+        self._inbox = queue.Queue() if address else self.queue
+        self._listener = None
+        self._threads = []
+        self._receivers = []
+
+    @property
+    def target(self):
+        """What a worker passes to ``yell.attach()``."""
+        return self.address or self.queue
+
+    def pool_kwargs(self) -> dict:
+        """``initializer``/``initargs`` that attach each pool worker to this aggregator."""
+        return {"initializer": attach, "initargs": (self.target,)}
+
+    def start(self):
+        if self.address:
+            self._listener = Listener(self.address, family="AF_UNIX")
+            self._spawn(self._accept)
+        self._spawn(self._work)
+        return self
+
+    def close(self, timeout=5.0):
+        """Write everything received so far and stop.
+
+        Connected workers get up to ``timeout`` seconds to hang up first.
+        """
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            try:
+                # wake up accept() so the thread can exit
+                Client(self.address, family="AF_UNIX").close()
+            except OSError:
+                pass
+            listener.close()
+            for receiver in self._receivers:
+                receiver.join(timeout)
+            self._receivers = []
+        self._inbox.put(self._stop)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, name="yell-aggregator", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept(self):
+        while self._listener is not None:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return
+            if self._listener is None:
+                connection.close()
+                return
+            receiver = threading.Thread(target=self._receive, args=(connection,), daemon=True)
+            receiver.start()
+            self._receivers.append(receiver)
+
+    def _receive(self, connection):
+        with connection:
+            while True:
+                try:
+                    self._inbox.put(connection.recv())
+                except (EOFError, OSError):
+                    return
+
+    def _work(self):
+        while True:
+            record = self._inbox.get()
+            if record is self._stop:
+                return
+            self.received += 1
+            try:
+                self.merge(record)
+                self.yell.render(record)
+            except Exception as e:
+                print(f"yell: failed to render {record!r} from pid {record.pid}: {e}", file=sys.stderr)
+
+    def merge(self, record):
+        caller = self.yell._caller_for(record.module)
+        caller.inc_call_count()
+        record.func_count = caller.log_func(record.function)
+        if record.lvl is None:
+            # the worker's own lvl includes how deep its nested() blocks and spans had it
+            record.lvl = caller.lvl
+        return record
+
+
+class Forwarder:
+    """The worker side: sends portable records to an ``Aggregator``.
+
+    Arguments are cut down to ``limits`` on the way, so a huge or deeply nested
+    value costs the worker a bounded amount of pickling.
+    """
+    limits = dict(max_depth=8, max_items=1_000, max_chars=10_000)
+
+    def __init__(self, target):
+        self.target = target
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._connection = None
+        if isinstance(target, (str, bytes, os.PathLike)):
+            self._connection = Client(os.fspath(target), family="AF_UNIX")
+
+    def __call__(self, record):
+        record = record.portable(**self.limits)
+        if self._connection is None:
+            self.target.put(record)
+            return
+        with self._lock:
+            self._connection.send(record)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def attach(target):
+    """Attach the package's ``yell`` instance to an aggregator. Picklable, for pool initializers."""
+    from . import yell
+    yell.attach(target)
@@ -1,3 +1,13 @@
+def _escape_table(codes, end):
+    foregrounds = [name for name in codes if not name.startswith("bg_") and name != "end"]
+    backgrounds = [None, *(name for name in codes if name.startswith("bg_"))]
+    return {
+        (fg, bg): (codes[fg] + (codes[bg] if bg else ""), end)
+        for fg in foregrounds
+        for bg in backgrounds
+    }
+
+
 class AnsiColors:
     black = "\033[30m"
     red = "\033[31m"
@@ -37,10 +47,26 @@ class AnsiColors:
 
     end = "\033[0m"
 
+    codes = {name: code for name, code in locals().items() if isinstance(code, str) and code.startswith("\033[")}
+
+    # (fg, bg) -> (prefix, suffix) for every foreground/background pair, built once
+    escapes = _escape_table(codes, end)
+
+    @classmethod
+    def escape(cls, fg, bg=None):
+        """The ``(prefix, suffix)`` that wraps text in ``fg`` on ``bg``. Unknown names add no code."""
+        pair = cls.escapes.get((fg, bg))
+        if pair is None:
+            if bg is not None and not bg.startswith("bg_"):
+                bg = f"bg_{bg}"
+            pair = (cls.codes.get(fg, "") + (cls.codes.get(bg, "") if bg else ""), cls.end)
+            cls.escapes[(fg, bg)] = pair
+        return pair
+
     def colorize(self, fg, text, bg=None):
-        fg_code = getattr(self, fg, "")
-        bg_code = getattr(self, bg, "") if bg else ""
-        return f"{fg_code}{bg_code}{text}{self.end}"
+        prefix, suffix = self.escape(fg, bg)
+        return f"{prefix}{text}{suffix}"
 
-    def is_valid(self, color):
-        return hasattr(self, color)
\ No newline at end of file
+    @classmethod
+    def is_valid(cls, color):
+        return color in cls.codes
\ No newline at end of file
@@ -0,0 +1,238 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+_ESCAPE = re.compile(r"\033\[[0-9;]*[a-zA-Z]")
+_RESET = ("\033[0m", "\033[m")
+
+
+@lru_cache(maxsize=4096)
+def char_width(ch) -> int:
+    """Terminal columns taken by one character: 2 for East Asian wide/fullwidth and most
+    emoji, 0 for combining marks and format characters like zero-width joiners, else 1."""
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+        return 0
+    if unicodedata.east_asian_width(ch) in ("W", "F"):
+        return 2
+    return 1
+
+
+def text_width(text) -> int:
+    """Columns taken by ``text``, which must not contain escape codes."""
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
+
+
+class AnsiWrap:
+    """Wrapping, filling, truncating and padding that understand ANSI escapes and wide characters.
+
+    Every method makes one left-to-right pass over its input. Escape sequences count as
+    zero width and are never split. A style that is open when a line is cut gets closed
+    at the end of that line and reopened at the start of the next. Everything is passed
+    in as arguments, so one instance can be shared between threads.
+    """
+
+    @staticmethod
+    def visible_width(text) -> int:
+        if "\033" not in text:
+            return text_width(text)
+        return text_width(_ESCAPE.sub("", text))
+
+    def wrap(self, text, width=70, subsequent_indent="", initial_indent="") -> list:
+        """Break ``text`` into lines no wider than ``width``, at spaces where possible."""
+        return _Wrapper(width, initial_indent, subsequent_indent).run(text)
+
+    def fill(self, text, width=70, **kwargs) -> str:
+        return "\n".join(self.wrap(text, width=width, **kwargs))
+
+    def truncate(self, text, width, placeholder="...") -> str:
+        """Cut ``text`` to ``width`` columns, ending with ``placeholder`` if anything was cut.
+
+        Only reads as far into ``text`` as it needs to, so a huge line costs no more than a short one.
+        """
+        _, _, cut = self._cut(text, width)
+        if not cut:
+            return text
+        head, styled, _ = self._cut(text, max(0, width - text_width(placeholder)))
+        return f"{head}{placeholder}{_RESET[0]}" if styled else f"{head}{placeholder}"
+
+    def pad(self, text, width, align="<") -> str:
+        """``format(text, f"{align}{width}")``, measuring visible columns instead of characters."""
+        gap = width - self.visible_width(text)
+        if gap <= 0:
+            return text
+        if align == ">":
+            return " " * gap + text
+        if align == "^":
+            return " " * (gap // 2) + text + " " * (gap - gap // 2)
+        return text + " " * gap
+
+    @staticmethod
+    def _cut(text, room) -> tuple:
+        """The first ``room`` columns of ``text``, whether a style is open there, and whether anything was left out."""
+        out = []
+        col = 0
+        styled = False
+        position = 0
+        length = len(text)
+        while position < length:
+            if text[position] == "\033":
+                match = _ESCAPE.match(text, position)
+                if match:
+                    out.append(match.group())
+                    styled = match.group() not in _RESET
+                    position = match.end()
+                    continue
+            # never look further ahead than the columns that are left could use
+            stop = min(length, position + room - col + 1)
+            escape = text.find("\033", position + 1, stop)
+            chunk = text[position:escape if escape >= 0 else stop]
+            if chunk.isascii() and col + len(chunk) <= room:
+                col += len(chunk)
+            else:
+                for i, ch in enumerate(chunk):
+                    col += char_width(ch)
+                    if col > room:
+                        out.append(chunk[:i])
+                        return "".join(out), styled, True
+            out.append(chunk)
+            position += len(chunk)
+        return "".join(out), styled, False
+
+
+class _Wrapper:
+    """State for one ``AnsiWrap.wrap`` call."""
+
+    def __init__(self, width, initial_indent, subsequent_indent):
+        self.width = max(width, text_width(subsequent_indent) + 1, text_width(initial_indent) + 1)
+        self.subsequent_indent = subsequent_indent
+        self.indent_width = text_width(subsequent_indent)
+        self.lines = []
+        self.line = [initial_indent] if initial_indent else []
+        self.col = self.start = text_width(initial_indent)
+        self.style = []
+        # where the last space on the current line is: (piece index, offset in piece, col, style)
+        self.space = None
+
+    def run(self, text) -> list:
+        position = 0
+        for match in _ESCAPE.finditer(text):
+            self.add_text(text[position:match.start()])
+            self.add_escape(match.group())
+            position = match.end()
+        self.add_text(text[position:])
+        self.lines.append(self.finish(self.line, self.style))
+        return self.lines
+
+    def add_escape(self, escape):
+        self.line.append(escape)
+        if escape in _RESET:
+            self.style = []
+        elif escape.endswith("m"):
+            self.style.append(escape)
+
+    def add_text(self, chunk):
+        while chunk:
+            if chunk.isascii():
+                chunk = self.add_ascii(chunk)
+            else:
+                chunk = self.add_wide(chunk)
+
+    def add_ascii(self, chunk) -> str:
+        room = self.width - self.col
+        if len(chunk) <= room:
+            self.append(chunk)
+            return ""
+        if room <= 0:
+            # a wide character already overfilled the line
+            self.newline()
+            return chunk.lstrip(" ")
+        space = chunk.rfind(" ", 0, room + 1)
+        if space >= 0 and self.fits(self.word_width(chunk, space + 1)):
+            self.line.append(chunk[:space])
+            self.newline()
+            return chunk[space + 1:].lstrip(" ")
+        if space < 0 and self.space is not None and self.fits(self.tail_width() + self.word_width(chunk, 0)):
+            self.break_at_space()
+            return chunk
+        # the word is too long for any line, so it's split wherever the line runs out
+        self.line.append(chunk[:room])
+        self.newline()
+        return chunk[room:].lstrip(" ")
+
+    def add_wide(self, chunk) -> str:
+        if self.col + text_width(chunk) <= self.width:
+            self.append(chunk)
+            return ""
+        col = self.col
+        for i, ch in enumerate(chunk):
+            col += char_width(ch)
+            if col <= self.width:
+                continue
+            if self.col == self.start and i == 0:
+                # too wide for the room next to the indent: it goes on the line anyway and sticks out
+                self.append(ch)
+                return chunk[1:]
+            self.append(chunk[:i])
+            if ch == " ":
+                self.newline()
+                return chunk[i + 1:].lstrip(" ")
+            if self.space is not None and self.fits(self.tail_width() + self.word_width(chunk, i)):
+                self.break_at_space()
+            else:
+                self.newline()
+            return chunk[i:]
+        self.append(chunk)
+        return ""
+
+    def fits(self, width) -> bool:
+        """Whether a word ``width`` columns wide would fit on the next line, after ``subsequent_indent``."""
+        return width <= self.width - self.indent_width
+
+    def tail_width(self) -> int:
+        """Columns on the current line after its last space."""
+        return self.col - self.space[2] - 1
+
+    @staticmethod
+    def word_width(chunk, start) -> int:
+        end = chunk.find(" ", start)
+        return text_width(chunk[start:end if end >= 0 else len(chunk)])
+
+    def append(self, piece):
+        if not piece:
+            return
+        space = piece.rfind(" ")
+        if space >= 0:
+            self.space = (len(self.line), space, self.col + text_width(piece[:space]), tuple(self.style))
+        self.line.append(piece)
+        self.col += text_width(piece)
+
+    def newline(self):
+        last = self.line[-1] if self.line else None
+        if last and last.endswith(" ") and last is not self.subsequent_indent:
+            self.line[-1] = last.rstrip(" ")
+        self.lines.append(self.finish(self.line, self.style))
+        self.start_line(self.style)
+
+    def start_line(self, style):
+        self.line = [self.subsequent_indent, *style]
+        self.col = self.start = self.indent_width
+        self.space = None
+
+    def break_at_space(self):
+        index, offset, col, style = self.space
+        piece = self.line[index]
+        head = self.line[:index] + [piece[:offset]]
+        tail = [piece[offset + 1:], *self.line[index + 1:]]
+        self.lines.append(self.finish(head, style))
+        self.start_line(style)
+        for piece in tail:
+            self.line.append(piece)
+            if not _ESCAPE.fullmatch(piece):
+                self.col += text_width(piece)
+
+    @staticmethod
+    def finish(pieces, style) -> str:
+        line = "".join(pieces)
+        return line + _RESET[0] if style else line
@@ -0,0 +1,135 @@
+import sys
+import warnings
+
+
+class ArraySummary:
+    """Short descriptions of NumPy arrays and pandas objects, computed with vectorized calls.
+
+    Neither library is imported here: a value can only be an ``ndarray`` or a ``DataFrame``
+    if the program already imported NumPy or pandas, so ``summarize`` looks them up in
+    ``sys.modules`` and costs two dict lookups for everything else.
+
+    A summary is a plain dict (shape, dtype, memory, min/max/mean, NaN count and a short
+    head/tail preview), which the tree renderer draws like any other dict.
+    """
+    preview = 3
+
+    @classmethod
+    def summarize(cls, value):
+        """A summary dict for an array, Series or DataFrame, or None for anything else."""
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(value, numpy.ndarray):
+            return cls.ndarray(value, numpy)
+        pandas = sys.modules.get("pandas")
+        if pandas is not None:
+            if isinstance(value, pandas.DataFrame):
+                return cls.data_frame(value, numpy)
+            if isinstance(value, pandas.Series):
+                return cls.series(value, numpy)
+        return None
+
+    @classmethod
+    def resolve(cls, kind):
+        """A ``TypeRegistry`` resolver: ``summarize`` as the renderer for array and frame types."""
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and issubclass(kind, numpy.ndarray):
+            return None, cls.summarize
+        pandas = sys.modules.get("pandas")
+        if pandas is not None and issubclass(kind, (pandas.DataFrame, pandas.Series)):
+            return None, cls.summarize
+        return None
+
+    @classmethod
+    def ndarray(cls, array, numpy) -> dict:
+        summary = {
+            "type": f"numpy.ndarray {cls.shape(array.shape)}",
+            "dtype": str(array.dtype),
+            "memory": cls.size(array.nbytes),
+        }
+        if array.size and cls.is_real(array.dtype, numpy):
+            summary.update(cls.stats(array, numpy))
+        n = cls.preview
+        flat = array.flat
+        if array.size <= 2 * n:
+            summary["values"] = cls.scalars(flat[:])
+        else:
+            summary["head"] = cls.scalars(flat[:n])
+            summary["tail"] = cls.scalars(flat[array.size - n:])
+        return summary
+
+    @classmethod
+    def series(cls, series, numpy) -> dict:
+        summary = {
+            "type": f"pandas.Series {cls.shape(series.shape)}",
+            "name": series.name,
+            "dtype": str(series.dtype),
+            "memory": cls.size(series.memory_usage(index=True, deep=False)),
+        }
+        if len(series) and numpy is not None and cls.is_real(series.dtype, numpy):
+            summary.update(cls.stats(series.to_numpy(), numpy))
+        else:
+            summary["nan"] = int(series.isna().sum())
+        summary.update(cls.rows(series))
+        return summary
+
+    @classmethod
+    def data_frame(cls, frame, numpy) -> dict:
+        summary = {
+            "type": f"pandas.DataFrame {cls.shape(frame.shape)}",
+            "memory": cls.size(int(frame.memory_usage(index=True, deep=False).sum())),
+            "nan": int(frame.isna().sum().sum()),
+        }
+        columns = {}
+        for name, dtype in list(frame.dtypes.items())[:20]:
+            column = str(dtype)
+            if len(frame) and numpy is not None and cls.is_real(dtype, numpy):
+                stats = cls.stats(frame[name].to_numpy(), numpy)
+                column += f"  min {stats['min']:g}  max {stats['max']:g}  mean {stats['mean']:g}"
+            columns[str(name)] = column
+        if len(frame.columns) > 20:
+            columns["…"] = f"{len(frame.columns) - 20:,} more"
+        summary["columns"] = columns
+        summary.update(cls.rows(frame))
+        return summary
+
+    @classmethod
+    def rows(cls, pandas_object) -> dict:
+        """``head``/``tail`` previews as lists of printed rows."""
+        n = cls.preview
+        if len(pandas_object) <= 2 * n:
+            return {"values": pandas_object.to_string().splitlines()}
+        return {"head": pandas_object.head(n).to_string().splitlines(),
+                "tail": pandas_object.tail(n).to_string().splitlines()}
+
+    @staticmethod
+    def stats(values, numpy) -> dict:
+        nan = int(numpy.count_nonzero(numpy.isnan(values))) if values.dtype.kind == "f" else 0
+        # the nan* reductions copy the array, so they're only worth it when there are NaNs to skip
+        low, high, mean = (numpy.nanmin, numpy.nanmax, numpy.nanmean) if nan else (numpy.min, numpy.max, numpy.mean)
+        with warnings.catch_warnings():
+            # an all-NaN array warns and gives nan, which is the right thing to show
+            warnings.simplefilter("ignore", RuntimeWarning)
+            stats = {"min": low(values).item(), "max": high(values).item(), "mean": mean(values).item()}
+        if values.dtype.kind == "f":
+            stats["nan"] = nan
+        return stats
+
+    @staticmethod
+    def is_real(dtype, numpy) -> bool:
+        """Integer or float: the dtypes min/max/mean make sense for."""
+        return isinstance(dtype, numpy.dtype) and dtype.kind in "iuf"
+
+    @staticmethod
+    def scalars(values) -> list:
+        return [value.item() if hasattr(value, "item") else value for value in values]
+
+    @staticmethod
+    def shape(shape) -> str:
+        return " × ".join(f"{n:,}" for n in shape) or "scalar"
+
+    @staticmethod
+    def size(nbytes) -> str:
+        for unit in ("bytes", "KiB", "MiB", "GiB"):
+            if nbytes < 1024 or unit == "GiB":
+                return f"{nbytes:,} {unit}" if unit == "bytes" else f"{nbytes:,.1f} {unit}"
+            nbytes /= 1024
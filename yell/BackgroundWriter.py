@@ -0,0 +1,128 @@
+import atexit
+import queue
+import sys
+import threading
+
+
+class BackgroundWriter:
+    """Renders and writes records on a worker thread fed by a bounded queue.
+
+    The calling thread only enqueues a ``Record``. When the queue is full, ``policy``
+    decides what happens:
+
+    * ``"block"``  - wait for room, nothing is lost.
+    * ``"drop"``   - discard the new record.
+    * ``"sample"`` - keep one of every ``sample_rate`` overflowing records (waiting for
+      room for that one) and discard the rest.
+
+    Dropped records are counted and reported in a single line once the queue drains.
+    Everything still queued is written when the interpreter exits.
+    """
+    policies = ("block", "drop", "sample")
+    _stop = object()
+
+    def __init__(self, render, maxsize=10_000, policy="block", sample_rate=10, notice=None):
+        if policy not in self.policies:
+            raise ValueError(f"unknown queue policy {policy!r}, expected one of {', '.join(self.policies)}")
+        self.render = render
+        self.notice = notice
+        self.policy = policy
+        self.sample_rate = max(1, int(sample_rate))
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.written = 0
+        self._overflow = 0
+        self._reported = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return self
+            self._thread = threading.Thread(target=self._work, name="yell-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def submit(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return True
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+        if self.policy == "sample":
+            self._overflow += 1
+            if self._overflow % self.sample_rate == 0:
+                self.queue.put(record)
+                return True
+        self.dropped += 1
+        return False
+
+    def flush(self, timeout=None):
+        """Block until every record queued so far has been written."""
+        if not self.running:
+            return
+        if timeout is None:
+            self.queue.join()
+            return
+        done = threading.Event()
+
+        def wait():
+            self.queue.join()
+            done.set()
+
+        threading.Thread(target=wait, daemon=True).start()
+        done.wait(timeout)
+
+    def after_fork(self):
+        """Start over in a forked child: the parent's thread, lock and queue don't carry over."""
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.dropped = self.written = self._overflow = self._reported = 0
+        self.start()
+
+    def close(self):
+        """Write what's left, then stop the worker."""
+        atexit.unregister(self.close)
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self.queue.put(self._stop)
+        thread.join()
+
+    def _work(self):
+        while True:
+            record = self.queue.get()
+            try:
+                if record is self._stop:
+                    return
+                self.render(record)
+                self.written += 1
+            except Exception as e:
+                print(f"yell: failed to render {record!r}: {e}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+            if self.queue.empty():
+                self._report_drops()
+
+    def _report_drops(self):
+        dropped = self.dropped
+        if dropped == self._reported:
+            return
+        message = f"yell: dropped {dropped - self._reported:,} records (queue full, policy={self.policy})"
+        self._reported = dropped
+        if self.notice is not None:
+            self.notice(message)
+        else:
+            print(message, file=sys.stderr)
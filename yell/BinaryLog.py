@@ -0,0 +1,163 @@
+import datetime
+import marshal
+import os
+import struct
+import threading
+
+from .Levels import Levels
+from .Record import Record
+
+
+class BinaryLog:
+    """Writes records to a compact binary file instead of rendering them.
+
+    Each record costs a ``marshal`` of its arguments and a few bytes of fixed fields; call
+    sites are written once per file and referred to by number after that. Frames collect
+    in a buffer that is written with one ``os.write`` per ``buffer_size`` bytes, on
+    ``flush()`` and on ``close()``. Render the file later with ``python -m yell render``,
+    which reads it back with ``BinaryLog.read``.
+
+    The file is opened for appending and every session starts with its own header, so
+    one file can collect several runs. A forked child writes to ``<path>.<pid>``.
+
+    Layout: a header ``<8sId`` (magic, pid, start time), then frames of ``<BI`` (type,
+    length) followed by the payload. A call site frame holds a marshalled
+    ``(id, module, function, lineno, lvl, stack, filename)``; a record frame holds ``<IBBdI``
+    (call site id, kind, flags, timestamp, call count) followed by the marshalled
+    ``(args, kwargs)``. Only read files you trust: ``marshal`` doesn't guard against
+    malicious data.
+    """
+    header = struct.Struct("<8sId")
+    frame = struct.Struct("<BI")
+    entry = struct.Struct("<IBBdI")
+    magic = b"YELLBIN1"
+    kinds = ("yell", "label", "debug", "info", "success", "warning", "error", "failure")
+    SITE = 1
+    RECORD = 2
+    SAME_CALLER = 1
+
+    def __init__(self, path, buffer_size=1 << 20):
+        self.path = os.fspath(path)
+        self.buffer_size = buffer_size
+        self.written = 0
+        self._kind_codes = {kind: code for code, kind in enumerate(self.kinds)}
+        self._lock = threading.Lock()
+        self._open(self.path)
+
+    def write(self, record):
+        kwargs = record.kwargs
+        if "file" in kwargs:
+            kwargs = {k: v for k, v in kwargs.items() if k != "file"}
+        try:
+            data = marshal.dumps((record.args, kwargs))
+        except ValueError:
+            # something marshal can't handle: fall back to the same reduced copy processes exchange
+            portable = record.portable()
+            data = marshal.dumps((portable.args, portable.kwargs))
+        key = (record.module, record.function, record.lineno, record.lvl, tuple(record.stack), record.filename)
+        flags = self.SAME_CALLER if record.same_caller else 0
+        fixed = self.entry.pack(0, self._kind_codes[record.kind], flags,
+                                record.timestamp.timestamp(), record.func_count or 0)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = len(self._sites)
+                definition = marshal.dumps((site, *key))
+                self._buffer += self.frame.pack(self.SITE, len(definition))
+                self._buffer += definition
+            self._buffer += self.frame.pack(self.RECORD, len(fixed) + len(data))
+            self._buffer += fixed
+            # the call site id is only known now, so it's patched into the fixed fields in place
+            struct.pack_into("<I", self._buffer, len(self._buffer) - len(fixed), site)
+            self._buffer += data
+            self.written += 1
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    def flush(self):
+        with self._lock:
+            self._write_buffer()
+
+    def close(self):
+        with self._lock:
+            if self._fd is None:
+                return
+            self._write_buffer()
+            os.close(self._fd)
+            self._fd = None
+
+    def after_fork(self):
+        """Leave the parent's buffer and file alone and start a file of our own."""
+        self._lock = threading.Lock()
+        self._open(f"{self.path}.{os.getpid()}")
+
+    def _open(self, path):
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._sites = {}
+        self._buffer = bytearray(self.header.pack(self.magic, os.getpid(), datetime.datetime.now().timestamp()))
+
+    def _write_buffer(self):
+        if self._fd is None:
+            return
+        view = memoryview(self._buffer)
+        while view:
+            view = view[os.write(self._fd, view):]
+        view.release()
+        self._buffer = bytearray()
+
+    @classmethod
+    def read(cls, path):
+        """Yield the records in a binary log, oldest first. A torn record at the end is skipped."""
+        with open(path, "rb") as file:
+            sites = {}
+            pid = None
+            while True:
+                first = file.read(1)
+                if not first:
+                    return
+                if first == cls.magic[:1]:
+                    head = first + file.read(cls.header.size - 1)
+                    if len(head) < cls.header.size:
+                        return
+                    magic, pid, _ = cls.header.unpack(head)
+                    if magic != cls.magic:
+                        raise ValueError(f"{path} is not a yell binary log")
+                    sites = {}
+                    continue
+                head = first + file.read(cls.frame.size - 1)
+                if len(head) < cls.frame.size:
+                    return
+                frame_type, length = cls.frame.unpack(head)
+                payload = file.read(length)
+                if len(payload) < length:
+                    return
+                if frame_type == cls.SITE:
+                    site, *fields = marshal.loads(payload)
+                    sites[site] = fields
+                elif frame_type == cls.RECORD:
+                    yield cls._record(payload, sites, pid)
+
+    @classmethod
+    def _record(cls, payload, sites, pid) -> Record:
+        site, kind, flags, timestamp, func_count = cls.entry.unpack_from(payload)
+        args, kwargs = marshal.loads(payload[cls.entry.size:])
+        # files written before call sites carried their file name have one field less
+        module, function, lineno, lvl, stack, filename = (*sites[site], None)[:6]
+        kind = cls.kinds[kind]
+        record = Record.__new__(Record)
+        record.kind = kind
+        record.level = Levels.names.get(kind, Levels.debug)
+        record.args = args
+        record.kwargs = kwargs
+        record.timestamp = datetime.datetime.fromtimestamp(timestamp)
+        record.module = module
+        record.lvl = lvl
+        record.function = function
+        record.func_count = func_count or None
+        record.stack = list(stack)
+        record.lineno = lineno
+        record.code_context = None
+        record.same_caller = bool(flags & cls.SAME_CALLER)
+        record.pid = pid
+        record.filename = filename
+        return record
@@ -0,0 +1,98 @@
+import os
+from .FrameCapture import FrameCapture
+
+
+class Callsite:
+    """Everything about a call site that never changes between calls.
+
+    A given ``(code object, line number)`` always lives in the same module and function,
+    so the module name, function label and resolved ``YellCaller`` are computed once
+    and reused for every later call from the same line.
+    """
+    __slots__ = ("code", "lineno", "filename", "module", "function", "label", "caller", "limit")
+
+    def __init__(self, code, lineno, caller, module, label):
+        self.code = code
+        self.lineno = lineno
+        self.filename = os.path.basename(code.co_filename)
+        self.module = module
+        self.function = code.co_name
+        self.label = label
+        self.caller = caller
+        self.limit = None
+
+    def __repr__(self):
+        return f"<Callsite: {self.filename}:{self.lineno} {self.label}>"
+
+
+class CallsiteTable:
+    """Interned ``Callsite`` objects keyed by ``(f_code, f_lineno)``.
+
+    Code objects don't cache their hash and hashing one walks its bytecode and
+    constants, so entries are keyed by ``id(code)`` instead. Every entry keeps a
+    reference to its code object, which means the id can't be reused while the entry
+    exists, and the identity check on lookup makes that explicit.
+    """
+
+    def __init__(self):
+        self._sites = {}
+        self._labels = {}
+        # id(code) -> (code, module name, YellCaller), so a new line in known code skips the module rules
+        self._modules = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def module_name(code, namespace=None) -> str:
+        """The dotted name of the module ``code`` runs in, from the ``__name__`` in its globals.
+        Scripts, which all run as ``__main__`` (``__mp_main__`` in spawned workers), go by their
+        file name instead."""
+        name = namespace.get("__name__") if namespace is not None else None
+        if not name or name in ("__main__", "__mp_main__"):
+            filename = os.path.basename(code.co_filename)
+            return filename[:-3]
+        return name
+
+    def label(self, code) -> str:
+        """The chain fragment for one frame, e.g. ``my_func()`` or ``script.py``."""
+        entry = self._labels.get(id(code))
+        if entry is not None and entry[0] is code:
+            return entry[1]
+        label = FrameCapture.get_func(code)
+        self._labels[id(code)] = (code, label)
+        return label
+
+    def lookup(self, code, lineno, resolve_caller, namespace=None) -> Callsite:
+        """Return the interned call site, resolving its ``YellCaller`` on first sight of its code.
+        ``namespace`` is the frame's globals, which the module name is read from."""
+        key = (id(code), lineno)
+        site = self._sites.get(key)
+        if site is not None and site.code is code:
+            self.hits += 1
+            return site
+        self.misses += 1
+        entry = self._modules.get(id(code))
+        if entry is not None and entry[0] is code:
+            _, module, caller = entry
+        else:
+            module = self.module_name(code, namespace)
+            caller = resolve_caller(module)
+            self._modules[id(code)] = (code, module, caller)
+        site = Callsite(code, lineno, caller, module, self.label(code))
+        self._sites[key] = site
+        return site
+
+    def clear(self):
+        self._sites.clear()
+        self._labels.clear()
+        self._modules.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "callsites": len(self._sites),
+            "fragments": len(self._labels),
+        }
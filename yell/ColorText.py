@@ -1,7 +1,11 @@
 import re
 from .AnsiColors import AnsiColors
 
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
 class ColorText:
+    __slots__ = ("_text", "_fg", "_bg", "_rendered")
     use_color = True
     ansi = AnsiColors()
     """A class for creating and managing colored text using ANSI color codes.
@@ -41,22 +45,33 @@ class ColorText:
         self._text = text
         self._fg = color
         self._bg = bg
+        self._rendered = None
 
     def __str__(self):
         """Convert the ColorText instance to a string with ANSI color codes.
 
+        The escape codes come from ``AnsiColors.escapes``. When the text is immutable the
+        result is cached, keyed on the text and colors it was rendered with, so shared
+        fragments like arrows are only formatted once.
+
         Returns:
             str: The text with applied ANSI color formatting
         """
         if not ColorText.use_color:
-            return self._text
+            return str(self._text)
+        text, fg, bg = self._text, self._fg, self._bg
+        cached = self._rendered
+        if cached is not None and cached[0] is text and cached[1] is fg and cached[2] is bg:
+            return cached[3]
         try:
-            if self._bg is not None and not self._bg.startswith("bg_") :
-                self._bg = f"bg_{self._bg}"
-            return AnsiColors().colorize(self._fg, self._text, self._bg)
+            prefix, suffix = AnsiColors.escape(fg, bg)
         except Exception as e:
             print(f"Error: {e}")
-            return self._text
+            return str(text)
+        rendered = f"{prefix}{text}{suffix}"
+        if isinstance(text, _IMMUTABLE):
+            self._rendered = (text, fg, bg, rendered)
+        return rendered
 
     def __repr__(self):
         """Get the string representation of the ColorText instance.
@@ -77,9 +92,10 @@ class ColorText:
     def __mul__(self, other):
         """Multiply the text content by a number."""
         new_text = self._text * other
-        text = ColorText(new_text, color=self._fg, bg=self._bg)
-        return str(text)
-        # return self.__text * other
+        if not ColorText.use_color:
+            return new_text
+        prefix, suffix = AnsiColors.escape(self._fg, self._bg)
+        return f"{prefix}{new_text}{suffix}"
 
 
     def __rmul__(self, other):
@@ -119,7 +135,7 @@ class ColorText:
 
     def set_fg(self, color):
         """Set the foreground color."""
-        if AnsiColors().is_valid(color):
+        if AnsiColors.is_valid(color):
             self._fg = color
         return self
 
@@ -130,7 +146,7 @@ class ColorText:
             return self
         if not color.startswith("bg_"):
             color = f"bg_{color}"
-        if AnsiColors().is_valid(color):
+        if AnsiColors.is_valid(color):
             self._bg = color
         return self
 
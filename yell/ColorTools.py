@@ -19,6 +19,8 @@ class ColorTools:
         "heavy": ["┏", "┓", "┛", "┗"],
         "double": ["╔", "╗", "╚", "╝"],
     }
+    _fragments = {}
+
     @staticmethod
     def disable_color(): return ColorText.disable_color()
     @staticmethod
@@ -71,10 +73,20 @@ class ColorTools:
     @staticmethod
     def chunk(color="white"): return ColorText('|---|', color)
 
+    @staticmethod
+    def fragment(text, color="white") -> str:
+        """``str(ColorText(text, color))`` for the short constant pieces drawn on every line,
+        memoized so they're only formatted once per color setting."""
+        key = (text, color, ColorText.use_color)
+        rendered = ColorTools._fragments.get(key)
+        if rendered is None:
+            rendered = ColorTools._fragments[key] = str(ColorText(text, color))
+        return rendered
+
     @staticmethod
     def color(text, color="white"):
         return ColorText(text, color=color)
 
     @staticmethod
-    def timestamp(): return ColorText(datetime.datetime.now().strftime("[%b %d | %H:%M:%S]")).red()
+    def timestamp(when=None): return ColorText((when or datetime.datetime.now()).strftime("[%b %d | %H:%M:%S]")).red()
 
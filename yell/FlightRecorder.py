@@ -0,0 +1,144 @@
+import itertools
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+
+class FlightRecorder:
+    """Keeps the last ``size`` records, unrendered, in a preallocated ring buffer.
+
+    Records are reduced with ``Record.portable`` and the given limits, so each slot holds
+    a bounded amount of data and memory stays fixed however long the process runs. With
+    ``path`` the ring lives in an mmap'd file instead of a list: every record is pickled
+    into a fixed-size slot as it arrives, so the file can still be read with ``load()``
+    after the process is killed outright. Each slot carries its length and a checksum, and
+    ``load()`` skips any slot that doesn't check out or unpickle, so a record torn by the
+    crash costs only itself.
+    """
+    header = struct.Struct("<8sIIQ")
+    # length, crc32
+    slot_header = struct.Struct("<II")
+    magic = b"YELLFR02"
+
+    def __init__(self, size=1000, path=None, slot_size=4096, max_depth=4, max_items=20, max_chars=500):
+        self.size = size
+        self.path = path
+        self.slot_size = slot_size
+        self.limits = dict(max_depth=max_depth, max_items=max_items, max_chars=max_chars)
+        self._counter = itertools.count()
+        self._count = 0
+        self._slots = None
+        self._file = None
+        self._map = None
+        if path is None:
+            self._slots = [None] * size
+        else:
+            self._open(path)
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    @property
+    def total(self):
+        """How many records have been added, including ones already overwritten."""
+        return self._count
+
+    def add(self, record):
+        index = next(self._counter)
+        self._count = index + 1
+        record = record.portable(**self.limits)
+        if self._map is None:
+            self._slots[index % self.size] = record
+            return
+        self._write_slot(index % self.size, self._pack(record))
+        self.header.pack_into(self._map, 0, self.magic, self.slot_size, self.size, index + 1)
+
+    def records(self) -> list:
+        """Everything still in the ring, oldest first."""
+        count = self._count
+        first = max(0, count - self.size)
+        if self._map is None:
+            return [self._slots[i % self.size] for i in range(first, count)]
+        records = (self._read_slot(self._map, self.slot_size, i % self.size) for i in range(first, count))
+        return [record for record in records if record is not None]
+
+    def after_fork(self):
+        """In a forked child, move a file-backed ring to a file of its own, ``<path>.<pid>``.
+
+        The parent's file is shared memory: writing on into it would overwrite the parent's
+        records, and its header count. An in-memory ring is already the child's own copy.
+        """
+        if self._map is None:
+            return
+        # unmapped without a flush; the parent's pages are the parent's to write
+        self._map.close()
+        self._file.close()
+        self._counter = itertools.count()
+        self._count = 0
+        self._open(f"{self.path}.{os.getpid()}")
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    @classmethod
+    def load(cls, path) -> list:
+        """Read the records left in a file-backed ring, e.g. by a process that died."""
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, slot_size, size, count = cls.header.unpack_from(data, 0)
+        if magic != cls.magic:
+            raise ValueError(f"{path} is not a yell flight recorder file")
+        first = max(0, count - size)
+        records = (cls._read_slot(data, slot_size, i % size) for i in range(first, count))
+        return [record for record in records if record is not None]
+
+    def _open(self, path):
+        length = self.header.size + self.size * self.slot_size
+        self._file = open(path, "w+b")
+        self._file.truncate(length)
+        self._map = mmap.mmap(self._file.fileno(), length)
+        self.header.pack_into(self._map, 0, self.magic, self.slot_size, self.size, 0)
+
+    def _pack(self, record) -> bytes:
+        """The pickled record, shrunk until it fits its slot; empty if even the smallest version doesn't."""
+        room = self.slot_size - self.slot_header.size
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > room:
+            record.args = (f"<{len(data):,} bytes of arguments didn't fit in a {self.slot_size:,} byte slot>",)
+            record.kwargs = {}
+            record.stack = record.stack[-3:]
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > room:
+            record.stack = []
+            record.code_context = None
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        # never cut: half a pickle is worse than none
+        return data if len(data) <= room else b""
+
+    def _write_slot(self, slot, data):
+        offset = self.header.size + slot * self.slot_size
+        start = offset + self.slot_header.size
+        self._map[start:start + len(data)] = data
+        self.slot_header.pack_into(self._map, offset, len(data), zlib.crc32(data))
+
+    @classmethod
+    def _read_slot(cls, buffer, slot_size, slot):
+        """The record in ``slot``, or None if it's empty, torn or won't unpickle."""
+        offset = cls.header.size + slot * slot_size
+        length, checksum = cls.slot_header.unpack_from(buffer, offset)
+        start = offset + cls.slot_header.size
+        if not length or length > slot_size - cls.slot_header.size:
+            return None
+        data = bytes(buffer[start:start + length])
+        if zlib.crc32(data) != checksum:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return None
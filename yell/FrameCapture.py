@@ -0,0 +1,88 @@
+import os
+import sys
+
+try:
+    _getframe = sys._getframe
+except AttributeError:  # pragma: no cover - non-CPython fallback
+    import inspect
+
+    def _getframe(depth=0):
+        frame = inspect.currentframe().f_back
+        for _ in range(depth):
+            frame = frame.f_back
+        return frame
+
+
+class CapturedFrame:
+    """The parts of a call site the renderers actually print."""
+    __slots__ = ("code", "function", "filename", "lineno", "chain", "code_context")
+
+    def __init__(self, code, function, filename, lineno, chain, code_context=None):
+        self.code = code
+        self.function = function
+        self.filename = filename
+        self.lineno = lineno
+        self.chain = chain
+        self.code_context = code_context
+
+    def __repr__(self):
+        return f"<CapturedFrame: {self.filename}:{self.lineno} {self.function}>"
+
+
+class FrameCapture:
+    """Walks the interpreter stack with ``sys._getframe`` instead of ``inspect.stack()``.
+
+    ``inspect.stack()`` builds a FrameInfo for every frame and reads source lines for
+    each of them. Yell only prints the function name, filename and line number of the
+    caller plus the function names up the chain, so this walks ``f_back`` once and
+    collects exactly that. Reading the source line is opt-in via ``with_source``.
+    """
+
+    def __init__(self, with_source=False):
+        self.with_source = with_source
+
+    @staticmethod
+    def get_func(code) -> str:
+        name = code.co_name
+        if name == "<module>":
+            return os.path.basename(code.co_filename)
+        return f"{name}()"
+
+    def call_chain(self, frame, label=None) -> list:
+        """Function labels from the outermost frame down to ``frame``.
+
+        ``label`` maps a code object to its chain fragment and defaults to ``get_func``;
+        pass a memoizing one (see ``CallsiteTable.label``) to skip rebuilding the strings.
+        """
+        get_func = label or self.get_func
+        chain = []
+        while frame is not None:
+            chain.append(get_func(frame.f_code))
+            frame = frame.f_back
+        chain.reverse()
+        return chain
+
+    @staticmethod
+    def frame(depth=0):
+        """The raw frame ``depth`` levels above the caller of this method."""
+        return _getframe(depth + 1)
+
+    def capture(self, depth=0, label=None, frame=None) -> CapturedFrame:
+        """Capture the frame ``depth`` levels above the caller of this method, or ``frame``."""
+        if frame is None:
+            frame = _getframe(depth + 1)
+        code = frame.f_code
+        lineno = frame.f_lineno
+        code_context = None
+        if self.with_source:
+            import linecache  # only when source is asked for: it pulls in tokenize
+            line = linecache.getline(code.co_filename, lineno, frame.f_globals)
+            code_context = [line] if line else None
+        return CapturedFrame(
+            code=code,
+            function=code.co_name,
+            filename=code.co_filename,
+            lineno=lineno,
+            chain=self.call_chain(frame, label),
+            code_context=code_context,
+        )
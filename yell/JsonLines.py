@@ -0,0 +1,80 @@
+import json
+import os
+
+from .ArraySummary import ArraySummary
+from .Record import to_portable
+
+
+class JsonLines:
+    """Serializes records as one JSON object per line, straight from the ``Record``.
+
+    Nothing is colored, boxed or wrapped. orjson is used when it's installed, the stdlib
+    ``json`` module otherwise; both give the same fields:
+
+        {"time": "2025-01-31T12:00:00.123456", "level": "info", "module": "app",
+         "function": "handle", "line": 42, "calls": 7, "stack": ["app.py", "handle()"],
+         "pid": 1234, "args": ["request handled", {"status": 200}]}
+
+    Values JSON can't represent are written as their ``str()``, arrays and data frames
+    as their ``ArraySummary``. Arguments that still can't be encoded, such as structures
+    that contain themselves, are cut down with ``to_portable``, and as a last resort
+    written as their ``str()``.
+    """
+    fallback_limits = dict(max_depth=8, max_items=1_000, max_chars=10_000)
+
+    def __init__(self, use_orjson=True):
+        self.encoder = None
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        if use_orjson and orjson is not None:
+            options = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+            self.encoder = "orjson"
+            self._errors = (TypeError,)
+            self._dumps = lambda payload: orjson.dumps(payload, default=self.default, option=options).decode()
+        else:
+            encoder = json.JSONEncoder(default=self.default, ensure_ascii=False, separators=(",", ":"))
+            self.encoder = "json"
+            self._errors = (TypeError, ValueError, RecursionError)
+            self._dumps = lambda payload: encoder.encode(payload) + "\n"
+
+    def line(self, record) -> str:
+        payload = {
+            "time": record.timestamp.isoformat(),
+            "level": record.kind,
+            "module": record.module,
+            "function": record.function,
+            "line": record.lineno,
+            "calls": record.func_count,
+            "stack": record.stack,
+            "pid": record.pid or os.getpid(),
+            "args": record.args,
+        }
+        title = record.kwargs.get("title")
+        if title is not None:
+            payload["title"] = title
+        try:
+            return self._dumps(payload)
+        except self._errors:
+            pass
+        payload["args"] = [self._encodable(arg) for arg in record.args]
+        return self._dumps(payload)
+
+    def _encodable(self, arg):
+        arg = to_portable(arg, **self.fallback_limits)
+        try:
+            self._dumps(arg)
+            return arg
+        except self._errors:
+            return str(arg)
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, float):
+            # float subclasses like numpy.float64, which json writes as numbers and orjson hands over
+            return float(value)
+        summary = ArraySummary.summarize(value)
+        if summary is not None:
+            return summary
+        return str(value)
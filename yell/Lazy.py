@@ -0,0 +1,51 @@
+from types import FunctionType
+
+
+class Lazy:
+    """An argument that's only worked out once the call it's passed to is going to print.
+
+        yell.debug("state", yell.lazy(json.dumps, state, indent=2))
+        yell.info("summary", lambda: df.describe())
+
+    A bare ``lambda`` that takes no arguments is treated the same way. Other callables,
+    like functions and classes, are printed as themselves. The value is computed on the
+    calling thread after the level, switch and rate limit checks, so a call that's
+    turned off never runs it. If computing it raises, the exception is shown in its
+    place instead of escaping from the log call.
+    """
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return f"Lazy({getattr(self.func, '__qualname__', self.func)!r})"
+
+    @staticmethod
+    def is_deferred(value) -> bool:
+        kind = type(value)
+        if kind is Lazy:
+            return True
+        return kind is FunctionType and value.__name__ == "<lambda>" and value.__code__.co_argcount == 0
+
+    @classmethod
+    def resolve(cls, values) -> tuple:
+        """``values`` with every deferred argument replaced by its value; ``values`` itself if there are none."""
+        for value in values:
+            if cls.is_deferred(value):
+                break
+        else:
+            return values
+        return tuple(cls.evaluate(value) if cls.is_deferred(value) else value for value in values)
+
+    @staticmethod
+    def evaluate(value):
+        try:
+            return value()
+        except Exception as e:
+            return f"<{value!r} raised {type(e).__name__}: {e}>"
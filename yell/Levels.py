@@ -0,0 +1,29 @@
+class Levels:
+    """Severity levels, lowest to highest. ``yell()`` and ``yell.label()`` log at debug."""
+    all = 0
+    debug = 10
+    info = 20
+    success = 25
+    warning = 30
+    error = 40
+    failure = 50
+
+    names = {
+        "all": all,
+        "debug": debug,
+        "info": info,
+        "success": success,
+        "warning": warning,
+        "error": error,
+        "failure": failure,
+    }
+
+    @classmethod
+    def to_level(cls, value) -> int:
+        """Accepts a level name like ``"warning"`` or a number."""
+        if value is None or isinstance(value, int):
+            return value
+        level = cls.names.get(str(value).lower())
+        if level is None:
+            raise ValueError(f"unknown level {value!r}, expected one of {', '.join(cls.names)}")
+        return level
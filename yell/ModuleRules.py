@@ -0,0 +1,136 @@
+import re
+from fnmatch import translate
+
+_WILDCARDS = frozenset("*?[")
+
+
+class _Rule:
+    __slots__ = ("pattern", "settings", "rank")
+
+    def __init__(self, pattern, settings, rank):
+        self.pattern = pattern
+        self.settings = settings
+        self.rank = rank
+
+
+class _Node:
+    """One dotted segment of the rules. ``rule`` ends exactly here, ``tail`` is a trailing
+    ``*`` that takes one or more further segments."""
+    __slots__ = ("children", "globs", "rule", "tail")
+
+    def __init__(self):
+        self.children = {}
+        # [(segment glob, compiled glob, _Node)]
+        self.globs = []
+        self.rule = None
+        self.tail = None
+
+
+class ModuleRules:
+    """Per-module settings from the ``modules`` config, matched against dotted module names.
+
+    * ``"myapp.db"`` matches that module only
+    * ``"myapp.db.*"`` matches every module below it, however deep
+    * ``"myapp.*.models"`` or ``"myapp.test_*"``: glob characters match within one segment
+    * ``"utils"``, no dots and no glob characters, matches any module whose last segment
+      is ``utils``, the way plain file names always have
+
+    When several rules match, the one with the most literal segments wins, then the
+    longer one, then an exact rule over a trailing ``*``. Plain-name rules lose to every
+    dotted rule. The dotted rules are compiled into a trie of segments, so a match reads
+    each segment of the name once rather than trying every rule, and the answer for each
+    name is cached until the rules change.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._basenames = {}
+        self._rules = {}
+        self._matches = {}
+
+    def __len__(self):
+        return len(self._rules)
+
+    def add(self, pattern, settings):
+        """Set the settings for ``pattern``, replacing any it already had."""
+        if not pattern or any(not segment for segment in pattern.split(".")):
+            raise ValueError(f"invalid module pattern: {pattern!r}")
+        rule = self._rules.get(pattern)
+        if rule is not None:
+            rule.settings = dict(settings)
+        else:
+            self._rules[pattern] = rule = _Rule(pattern, dict(settings), self._rank(pattern))
+            self._insert(rule)
+        self._matches.clear()
+        return rule
+
+    def update(self, pattern, **settings):
+        """Change some settings of ``pattern``, adding the rule if it's new."""
+        rule = self._rules.get(pattern)
+        self.add(pattern, {**(rule.settings if rule else {}), **settings})
+
+    def levels(self) -> list:
+        return [rule.settings["level"] for rule in self._rules.values() if rule.settings.get("level") is not None]
+
+    def match(self, name) -> dict:
+        """The settings of the most specific rule matching the dotted module ``name``, or None."""
+        try:
+            rule = self._matches[name]
+        except KeyError:
+            rule = self._matches[name] = self._best(name)
+        return None if rule is None else rule.settings
+
+    @staticmethod
+    def _rank(pattern) -> tuple:
+        segments = pattern.split(".")
+        if len(segments) == 1 and not _WILDCARDS.intersection(pattern):
+            return (-1, 1, 1)
+        literal = sum(1 for segment in segments if not _WILDCARDS.intersection(segment))
+        return (literal, len(segments), segments[-1] != "*")
+
+    def _insert(self, rule):
+        segments = rule.pattern.split(".")
+        if rule.rank[0] < 0:
+            self._basenames[rule.pattern] = rule
+            return
+        tail = segments[-1] == "*"
+        node = self._root
+        for segment in segments[:-1] if tail else segments:
+            if _WILDCARDS.intersection(segment):
+                for glob, _, child in node.globs:
+                    if glob == segment:
+                        break
+                else:
+                    child = _Node()
+                    node.globs.append((segment, re.compile(translate(segment)).match, child))
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Node()
+            node = child
+        if tail:
+            node.tail = rule
+        else:
+            node.rule = rule
+
+    def _best(self, name):
+        segments = name.split(".")
+        best = self._basenames.get(segments[-1])
+        # (node, index of the next segment), walked depth first
+        pending = [(self._root, 0)]
+        while pending:
+            node, index = pending.pop()
+            if index == len(segments):
+                found = node.rule
+            else:
+                found = node.tail
+                segment = segments[index]
+                child = node.children.get(segment)
+                if child is not None:
+                    pending.append((child, index + 1))
+                for _, matches, child in node.globs:
+                    if matches(segment):
+                        pending.append((child, index + 1))
+            if found is not None and (best is None or found.rank > best.rank):
+                best = found
+        return best
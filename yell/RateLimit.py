@@ -0,0 +1,61 @@
+import time
+
+
+class RateLimit:
+    """Decides which calls from one call site get through.
+
+    * ``rate``   - token bucket: on average ``rate`` calls per second, with bursts of up
+      to ``burst`` (default ``max(1, rate)``).
+    * ``sample`` - only every ``sample``-th call, starting with the first.
+    * ``first``  - only the first ``first`` calls, then silence.
+
+    Any combination can be set; a call has to pass all of them. Calls that don't are
+    counted in ``suppressed`` until ``take_suppressed()`` collects them for a summary.
+    """
+    __slots__ = ("spec", "rate", "burst", "sample", "first", "tokens", "refilled", "seen", "suppressed")
+    options = ("rate", "burst", "sample", "first")
+
+    def __init__(self, rate=None, burst=None, sample=None, first=None):
+        self.spec = (rate, burst, sample, first)
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate or 0)
+        self.sample = sample
+        self.first = first
+        self.tokens = self.burst
+        self.refilled = time.monotonic()
+        self.seen = 0
+        self.suppressed = 0
+
+    def allow(self, now=None) -> bool:
+        seen = self.seen
+        self.seen = seen + 1
+        if self.first is not None and seen >= self.first:
+            return self._suppress()
+        if self.sample is not None and seen % self.sample:
+            return self._suppress()
+        if self.rate is not None:
+            now = time.monotonic() if now is None else now
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens < 1:
+                return self._suppress()
+            self.tokens -= 1
+        return True
+
+    def take_suppressed(self) -> int:
+        suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
+
+    def describe(self) -> str:
+        parts = []
+        if self.first is not None:
+            parts.append(f"first {self.first:,}")
+        if self.sample is not None:
+            parts.append(f"1 in {self.sample:,}")
+        if self.rate is not None:
+            parts.append(f"{self.rate:g}/s")
+        return ", ".join(parts)
+
+    def _suppress(self) -> bool:
+        self.suppressed += 1
+        return False
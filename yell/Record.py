@@ -0,0 +1,127 @@
+import os
+import datetime
+
+from .ArraySummary import ArraySummary
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def _text(value) -> str:
+    """``str(value)``, or its ``repr`` if that raises, so a broken ``__str__`` can't escape a log call."""
+    try:
+        return str(value)
+    except Exception:
+        try:
+            return repr(value)
+        except Exception:
+            return f"<unprintable {type(value).__name__}>"
+
+
+def to_portable(value, max_depth=None, max_items=None, max_chars=None, _depth=0, _ancestors=None):
+    """Reduce ``value`` to dicts, lists, tuples and primitives so it can be pickled anywhere.
+
+    Arrays and data frames become their ``ArraySummary``. Anything else becomes its
+    ``str()``, which is what the renderers print for it anyway.
+    The optional limits cap nesting depth, items per container and string length.
+    A container that contains itself becomes ``{…cycle}`` / ``[…cycle]``, like in a tree.
+    """
+    if isinstance(value, _PRIMITIVES):
+        if max_chars is not None and isinstance(value, str) and len(value) > max_chars:
+            return value[:max_chars] + "..."
+        return value
+    if max_depth is not None and _depth >= max_depth:
+        return to_portable(_text(value), max_chars=max_chars)
+    if isinstance(value, (dict, list, tuple)):
+        if _ancestors is None:
+            _ancestors = set()
+        if id(value) in _ancestors:
+            return "{…cycle}" if isinstance(value, dict) else "[…cycle]"
+        _ancestors.add(id(value))
+        try:
+            return _portable_container(value, max_depth, max_items, max_chars, _depth, _ancestors)
+        finally:
+            _ancestors.discard(id(value))
+    try:
+        summary = ArraySummary.summarize(value)
+    except Exception:
+        summary = None
+    if summary is not None:
+        return to_portable(summary, max_depth, max_items, max_chars, _depth, _ancestors)
+    return to_portable(_text(value), max_chars=max_chars)
+
+
+def _portable_container(value, max_depth, max_items, max_chars, depth, ancestors):
+    limits = (max_depth, max_items, max_chars, depth + 1, ancestors)
+    if isinstance(value, dict):
+        items = list(value.items())
+        if max_items is not None and len(items) > max_items:
+            items = items[:max_items] + [("...", f"{len(value) - max_items} more")]
+        return {to_portable(k, *limits): to_portable(v, *limits) for k, v in items}
+    items = list(value)
+    overflow = 0
+    if max_items is not None and len(items) > max_items:
+        overflow = len(items) - max_items
+        items = items[:max_items]
+    items = [to_portable(v, *limits) for v in items]
+    if overflow:
+        items.append(f"... {overflow} more")
+    return tuple(items) if isinstance(value, tuple) else items
+
+
+class Record:
+    """One captured call, ready to be rendered now or later on another thread.
+
+    Holds the raw arguments plus the ``CallerSnapshot`` fields the renderers print, so
+    rendering never has to look at the caller again. The arguments themselves
+    are kept by reference: mutating them before a deferred record is written changes
+    what gets printed.
+    """
+    __slots__ = ("kind", "level", "args", "kwargs", "timestamp",
+                 "module", "lvl", "function", "func_count", "stack", "lineno", "code_context",
+                 "same_caller", "pid", "filename")
+
+    def __init__(self, kind, level, args, kwargs, caller, same_caller=False, timestamp=None):
+        self.kind = kind
+        self.level = level
+        self.args = args
+        self.kwargs = kwargs
+        self.timestamp = timestamp or datetime.datetime.now()
+        self.module = caller.name
+        self.lvl = caller.lvl
+        self.function = caller.function
+        self.func_count = caller.func_count
+        self.stack = caller.stack
+        self.lineno = caller.lineno
+        self.code_context = caller.code_context
+        self.filename = caller.filename
+        self.same_caller = same_caller
+        self.pid = None
+
+    def portable(self, **limits):
+        """A copy that can cross a process boundary: arguments reduced by ``to_portable``,
+        unpicklable print options like ``file`` dropped, and stamped with this process id."""
+        record = Record.__new__(Record)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        try:
+            record.args = to_portable(self.args, **limits)
+            record.kwargs = {k: to_portable(v, **limits) for k, v in self.kwargs.items() if k != "file"}
+        except Exception:
+            # the record still goes out, with each argument as text, rather than raising from the log call
+            record.args = tuple(to_portable(_text(arg), max_chars=limits.get("max_chars")) for arg in self.args)
+            record.kwargs = {k: v for k, v in self.kwargs.items() if k != "file" and isinstance(v, _PRIMITIVES)}
+        record.pid = os.getpid()
+        return record
+
+    def __reduce__(self):
+        return Record._restore, (tuple(getattr(self, name) for name in self.__slots__),)
+
+    @classmethod
+    def _restore(cls, state):
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, state):
+            setattr(record, name, value)
+        return record
+
+    def __repr__(self):
+        return f"<Record: {self.kind} {self.module}.{self.function}:{self.lineno}>"
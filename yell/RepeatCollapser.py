@@ -0,0 +1,115 @@
+import copy
+import datetime
+import threading
+
+from .Record import Record, to_portable
+
+
+class RepeatCollapser:
+    """Holds back messages that repeat the previous one from the same call site.
+
+    The first message of a run goes out as usual. Identical messages after it are only
+    counted, and the run is written as one record, ``repeated 12,408 times over 3.2s``,
+    before the next message that does get printed, when ``window`` seconds have passed
+    since the run started, or on ``flush()``. A timer thread writes runs whose window is
+    up, so a source that goes quiet still gets its summary on time. Call sites that
+    alternate in a loop are each collapsed.
+
+    Messages are compared by a size-limited ``to_portable`` snapshot taken when they're
+    offered, so an object that's mutated between calls isn't mistaken for a repeat.
+    """
+    limits = dict(max_depth=4, max_items=50, max_chars=200)
+
+    def __init__(self, emit, window=5.0):
+        self.emit = emit
+        self.window = window
+        self.collapsed = 0
+        # (kind, module, function, lineno) -> [fingerprint, first record, last record, repeats]
+        self._runs = {}
+        self._lock = threading.Lock()
+        # fires when the oldest held run's window is up; only running while something is held
+        self._timer = None
+
+    def offer(self, record) -> bool:
+        """True if ``record`` repeats its call site's last message and was held back."""
+        key = (record.kind, record.module, record.function, record.lineno)
+        fingerprint = to_portable((record.args, record.kwargs), **self.limits)
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None and run[0] == fingerprint:
+                run[2] = record
+                run[3] += 1
+                self.collapsed += 1
+                if (record.timestamp - run[1].timestamp).total_seconds() < self.window:
+                    if self._timer is None:
+                        self._schedule()
+                    return True
+                # the window is up: report the run so far and keep counting from here
+                self._runs[key] = [fingerprint, record, record, 0]
+                ended = [run]
+                held = True
+            else:
+                # something is about to be printed, so every held run is reported first to keep the order
+                ended = self._end_runs()
+                self._runs[key] = [fingerprint, record, record, 0]
+                held = False
+        for run in ended:
+            self.emit(self.summary(run))
+        return held
+
+    def flush(self):
+        """Write a summary for every run that's still being held."""
+        with self._lock:
+            ended = self._end_runs()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for run in ended:
+            self.emit(self.summary(run))
+
+    def after_fork(self):
+        """Forget the parent's runs; it reports them itself."""
+        self._lock = threading.Lock()
+        self._runs = {}
+        self._timer = None
+
+    def _end_runs(self, started_by=None) -> list:
+        """Copies of the runs that have repeats, or only those started by ``started_by``,
+        which restart from their last record."""
+        ended = []
+        for run in self._runs.values():
+            if run[3] and (started_by is None or run[1].timestamp <= started_by):
+                ended.append(list(run))
+                run[1] = run[2]
+                run[3] = 0
+        return ended
+
+    def _schedule(self):
+        """Start the timer for the oldest run that's holding repeats. Called with the lock held."""
+        started = [run[1].timestamp for run in self._runs.values() if run[3]]
+        if not started:
+            return
+        delay = self.window - (datetime.datetime.now() - min(started)).total_seconds()
+        self._timer = threading.Timer(max(delay, 0.0), self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                # cancelled by flush(), or already replaced
+                return
+            self._timer = None
+            ended = self._end_runs(started_by=datetime.datetime.now() - datetime.timedelta(seconds=self.window))
+            self._schedule()
+        for run in ended:
+            self.emit(self.summary(run))
+
+    def summary(self, run) -> Record:
+        _, first, last, repeats = run
+        seconds = (last.timestamp - first.timestamp).total_seconds()
+        record = copy.copy(last)
+        record.args = (f"repeated {repeats:,} times over {seconds:.1f}s",)
+        record.kwargs = {k: v for k, v in last.kwargs.items() if k not in ("title", "is_loop")}
+        record.same_caller = True
+        return record
@@ -0,0 +1,151 @@
+import threading
+import time
+from threading import get_ident
+from time import perf_counter_ns
+
+from .Timings import format_ns
+
+
+class _State(threading.local):
+    def __init__(self, shards):
+        # phase -> [calls, ns]; only this thread writes to it. Kept by thread id, like Timings,
+        # so short-lived threads reuse the totals of finished ones instead of piling up
+        self.totals = shards.setdefault(get_ident(), {})
+        # ns spent in instrumented phases nested inside the one currently running
+        self.inner = 0
+
+
+class SelfStats:
+    """Counts and times the phases of Yell's own work, to see what logging costs.
+
+    ``install`` shadows the methods behind each phase with timed wrappers on one ``Yell``
+    instance, and ``uninstall`` removes them again, so while it's off nothing is measured
+    and nothing is paid. Times are exclusive: the lines ``wrap`` draws inside a box count
+    as ``width``, not ``box``, so the phases add up to the total. The phases are
+
+    * ``capture`` - ``handle_caller``: finding the call site, stack and counts
+    * ``tree``    - drawing ``yell()`` trees, while the lines are being taken
+    * ``width``   - ``conform_width`` and ``wrap``
+    * ``box``     - the rest of a boxed message: borders, padding and the call chain
+    * ``output``  - ``write``
+
+    With ``interval`` set, ``report`` is called with a summary line every ``interval``
+    seconds, checked after each write.
+    """
+    phases = {
+        "capture": ("handle_caller",),
+        "tree": ("_Yell__user_stuff",),
+        "width": ("conform_width", "wrap"),
+        "box": ("_Yell__log",),
+        "output": ("write",),
+    }
+    generators = ("_Yell__user_stuff",)
+    # find their caller by counting frames, so they're told about the wrapper's
+    frame_counting = ("handle_caller",)
+
+    def __init__(self, interval=None, report=None):
+        self.interval = interval
+        self.report = report
+        # thread id -> totals
+        self._shards = {}
+        self._state = _State(self._shards)
+        self._installed = []
+        self._reported = time.monotonic()
+
+    def install(self, target):
+        for phase, names in self.phases.items():
+            for name in names:
+                if name in self.generators:
+                    wrap = self._timed_generator
+                elif name in self.frame_counting:
+                    wrap = self._timed_frames
+                else:
+                    wrap = self._timed
+                setattr(target, name, wrap(phase, getattr(target, name)))
+                self._installed.append(name)
+        return self
+
+    def uninstall(self, target):
+        for name in self._installed:
+            target.__dict__.pop(name, None)
+        self._installed = []
+
+    def summary(self) -> dict:
+        """``{phase: {"calls", "total_ns", "mean_ns", "share"}}``, with ``share`` of the time of all phases."""
+        merged = {phase: [0, 0] for phase in self.phases}
+        for totals in list(self._shards.values()):
+            for phase, (calls, ns) in list(totals.items()):
+                merged[phase][0] += calls
+                merged[phase][1] += ns
+        everything = sum(ns for _, ns in merged.values()) or 1
+        return {phase: {"calls": calls, "total_ns": ns, "mean_ns": ns / calls if calls else 0, "share": ns / everything}
+                for phase, (calls, ns) in merged.items()}
+
+    def line(self) -> str:
+        parts = [f"{phase} {format_ns(numbers['mean_ns'])} x {numbers['calls']:,} ({numbers['share']:.0%})"
+                 for phase, numbers in self.summary().items() if numbers["calls"]]
+        return "yell: " + (", ".join(parts) if parts else "nothing measured yet")
+
+    def _timed(self, phase, func):
+        state = self._state
+
+        def timed(*args, **kwargs):
+            outer = state.inner
+            state.inner = 0
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                entry = state.totals.get(phase)
+                if entry is None:
+                    entry = state.totals[phase] = [0, 0]
+                entry[0] += 1
+                entry[1] += elapsed - state.inner
+                state.inner = outer + elapsed
+                if phase == "output" and self.interval is not None:
+                    self._maybe_report()
+
+        return timed
+
+    def _timed_frames(self, phase, func):
+        """Like ``_timed``, for ``handle_caller``: ``depth`` is raised by the two frames the wrappers add."""
+        timed = self._timed(phase, func)
+
+        def capture(level=None, depth=2, kwargs=None):
+            return timed(level, depth=depth + 2, kwargs=kwargs)
+
+        return capture
+
+    def _timed_generator(self, phase, func):
+        """Like ``_timed``, but the time is taken inside each step of the generator ``func`` returns."""
+        state = self._state
+
+        def timed(*args, **kwargs):
+            lines = func(*args, **kwargs)
+            entry = state.totals.setdefault(phase, [0, 0])
+            entry[0] += 1
+            while True:
+                outer = state.inner
+                state.inner = 0
+                start = perf_counter_ns()
+                try:
+                    line = next(lines)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = perf_counter_ns() - start
+                    state.totals.setdefault(phase, [0, 0])[1] += elapsed - state.inner
+                    state.inner = outer + elapsed
+                yield line
+
+        return timed
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        if now - self._reported < self.interval:
+            return
+        # moved on before reporting, since writing the report is itself a write
+        self._reported = now
+        if self.report is not None:
+            self.report(self.line())
@@ -0,0 +1,97 @@
+from .AnsiColors import AnsiColors
+from .AnsiWrap import text_width
+from .ColorText import ColorText
+
+
+class StyledText:
+    """A line of text built from ``(text, color)`` segments that knows its visible width.
+
+    The width is tracked in terminal columns as segments are appended, so checking whether a line fits is a
+    length lookup instead of a regex pass over escape codes. ANSI codes are only produced
+    when the line is finally turned into a string. Adjacent segments with the same color
+    are merged as they're appended.
+
+        line = StyledText(" ").append("key", "bright_yellow").append(": ")
+        len(line)  # 6
+        str(line)  # ' \x1b[93mkey\x1b[0m: '
+    """
+    __slots__ = ("segments", "width")
+
+    def __init__(self, text="", color=None):
+        self.segments = []
+        self.width = 0
+        if text != "":
+            self.append(text, color)
+
+    def append(self, text, color=None) -> "StyledText":
+        if type(text) is not str:
+            text = str(text)
+        segments = self.segments
+        if segments and segments[-1][1] == color:
+            segments[-1] = (segments[-1][0] + text, color)
+        elif text:
+            segments.append((text, color))
+        self.width += text_width(text)
+        return self
+
+    def extend(self, other) -> "StyledText":
+        """Append another ``StyledText``, or anything else as unstyled text."""
+        if isinstance(other, StyledText):
+            theirs = other.segments
+            if not theirs:
+                return self
+            ours = self.segments
+            if ours and ours[-1][1] == theirs[0][1]:
+                ours[-1] = (ours[-1][0] + theirs[0][0], theirs[0][1])
+                ours.extend(theirs[1:])
+            else:
+                ours.extend(theirs)
+            self.width += other.width
+            return self
+        return self.append(other)
+
+    def copy(self) -> "StyledText":
+        twin = StyledText()
+        twin.segments = list(self.segments)
+        twin.width = self.width
+        return twin
+
+    def plain(self) -> str:
+        return "".join([text for text, _ in self.segments])
+
+    def split(self, sep="\n") -> list:
+        """Split into lines on ``sep``, keeping each piece's color."""
+        if not any(sep in text for text, _ in self.segments):
+            return [self]
+        lines = [StyledText()]
+        for text, color in self.segments:
+            pieces = text.split(sep)
+            lines[-1].append(pieces[0], color)
+            for piece in pieces[1:]:
+                lines.append(StyledText(piece, color))
+        return lines
+
+    def __len__(self):
+        return self.width
+
+    def __str__(self):
+        if not ColorText.use_color:
+            return self.plain()
+        escape = AnsiColors.escape
+        out = []
+        for text, color in self.segments:
+            if color is None:
+                out.append(text)
+            else:
+                prefix, suffix = escape(color)
+                out.append(f"{prefix}{text}{suffix}")
+        return "".join(out)
+
+    def __add__(self, other):
+        return str(self) + str(other)
+
+    def __radd__(self, other):
+        return str(other) + str(self)
+
+    def __repr__(self):
+        return f"<StyledText: {self.plain()!r}>"
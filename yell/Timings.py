@@ -0,0 +1,223 @@
+import functools
+import threading
+from threading import get_ident
+from time import perf_counter_ns
+
+from .Lazy import Lazy
+
+
+def format_ns(ns) -> str:
+    """A duration in the largest unit that keeps it above 1, e.g. ``812 ns`` or ``12.3 ms``."""
+    if ns < 1_000:
+        return f"{ns:.0f} ns"
+    if ns < 1_000_000:
+        return f"{ns / 1_000:.1f} us"
+    if ns < 1_000_000_000:
+        return f"{ns / 1_000_000:.1f} ms"
+    return f"{ns / 1_000_000_000:.2f} s"
+
+
+def _uniform() -> float:
+    """``random.random()``. The first call imports random, which ``import yell`` leaves out,
+    and puts it in this function's place, so later calls cost no more than a module-level import."""
+    global _uniform
+    from random import random
+    _uniform = random
+    return random()
+
+
+class _Timing:
+    """Running numbers for one span name. ``samples`` is a uniform sample of every duration
+    seen, at most ``Timings.reservoir`` long, which the p95 is read from."""
+    __slots__ = ("count", "total", "min", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        # no call is ever this fast or this slow, so the first one replaces both
+        self.min = float("inf")
+        self.max = -1
+        self.samples = []
+
+    def add(self, ns, reservoir):
+        self.count = count = self.count + 1
+        self.total += ns
+        if ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        samples = self.samples
+        if len(samples) < reservoir:
+            samples.append(ns)
+        else:
+            slot = int(_uniform() * count)
+            if slot < reservoir:
+                samples[slot] = ns
+
+    @staticmethod
+    def percentile(timings, p) -> int:
+        """The ``p``th percentile over several threads' timings of one name. Each sample stands
+        for ``count / len(samples)`` calls of its thread, so busy threads weigh more."""
+        weighted = sorted((ns, timing.count / len(timing.samples)) for timing in timings for ns in timing.samples)
+        target = p / 100 * sum(weight for _, weight in weighted)
+        seen = 0
+        for ns, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return ns
+        return weighted[-1][0]
+
+    @classmethod
+    def summary(cls, timings) -> dict:
+        count = sum(timing.count for timing in timings)
+        total = sum(timing.total for timing in timings)
+        return {
+            "calls": count,
+            "total_ns": total,
+            "min_ns": min(timing.min for timing in timings),
+            "mean_ns": total / count,
+            "p95_ns": cls.percentile(timings, 95),
+            "max_ns": max(timing.max for timing in timings),
+        }
+
+
+class _Shard(threading.local):
+    def __init__(self, shards):
+        # name -> _Timing; only this thread writes to it. Shards are kept by thread id, so a
+        # thread that gets a finished one's id carries on with its numbers instead of adding more
+        self.timings = shards.setdefault(get_ident(), {})
+
+
+class Timings:
+    """Durations of every ``yell.span()`` and ``@yell.timed`` call, by name.
+
+    Each name keeps its call count, total, min and max, plus a fixed-size random sample
+    of its durations for the p95, so memory stays flat however often it runs. Every
+    thread adds to its own numbers, so ``add`` takes no lock; a summary merges them.
+    """
+    reservoir = 1_024
+
+    def __init__(self):
+        # thread id -> {name: _Timing}
+        self._shards = {}
+        self._local = _Shard(self._shards)
+
+    def add(self, name, ns):
+        timings = self._local.timings
+        timing = timings.get(name)
+        if timing is None:
+            timing = timings[name] = _Timing()
+        timing.add(ns, self.reservoir)
+
+    def summary(self) -> dict:
+        """``{name: {"calls", "total_ns", "min_ns", "mean_ns", "p95_ns", "max_ns"}}``, slowest total first."""
+        by_name = {}
+        for timings in list(self._shards.values()):
+            for name, timing in list(timings.items()):
+                if timing.count:
+                    by_name.setdefault(name, []).append(timing)
+        summaries = {name: _Timing.summary(timings) for name, timings in by_name.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]["total_ns"], reverse=True))
+
+    def report(self) -> list:
+        """The summary as the lines of a table."""
+        columns = ("calls", "total", "min", "mean", "p95", "max")
+        summaries = self.summary()
+        width = max([len("timing"), *map(len, map(str, summaries))])
+        lines = [f"{'timing':<{width}}" + "".join(f"{column:>11}" for column in columns)]
+        for name, numbers in summaries.items():
+            durations = (numbers[key] for key in ("total_ns", "min_ns", "mean_ns", "p95_ns", "max_ns"))
+            lines.append(f"{str(name):<{width}}{numbers['calls']:>11,}" + "".join(f"{format_ns(ns):>11}" for ns in durations))
+        return lines
+
+    def clear(self):
+        for timings in list(self._shards.values()):
+            timings.clear()
+
+    def after_fork(self):
+        """Keep only the forking thread's numbers; the other threads aren't in the child."""
+        timings = self._local.timings
+        self._shards.clear()
+        self._shards[get_ident()] = timings
+
+
+class Span:
+    """Times a block and draws one line for it when it ends, e.g. ``-[ load config 4.2 ms ]-``.
+
+    Everything yelled inside the block is drawn one level deeper, like ``yell.nested()``,
+    so nested spans and messages show where the time went. With ``show=False`` there's
+    no line to nest under, so only the duration is kept. The line is a ``label``
+    attributed to the code around the block, so it's filtered like any other debug call;
+    the duration is always added to ``yell.timings``. ``depth`` is how many frames
+    ``__exit__`` is below that code.
+    """
+    __slots__ = ("yell", "name", "show", "depth", "elapsed", "_token", "_start", "_raised")
+
+    def __init__(self, yell, name, show=True, depth=1):
+        self.yell = yell
+        self.name = name
+        self.show = show
+        self.depth = depth
+        self.elapsed = None
+        self._token = None
+        self._start = None
+        self._raised = None
+
+    def __enter__(self):
+        if self.show:
+            depth = self.yell._depth
+            self._token = depth.set(depth.get() + 1)
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = perf_counter_ns() - self._start
+        self.yell.timings.add(self.name, self.elapsed)
+        if self.show:
+            self.yell._depth.reset(self._token)
+            self._raised = exc_type
+            # the text is only put together if the line is going to be drawn
+            record = self.yell.capture("label", (Lazy(self.text),), {}, depth=self.depth)
+            if record is not None:
+                self.yell.emit(record)
+        return False
+
+    def text(self) -> str:
+        text = f"{self.name} {format_ns(self.elapsed)}"
+        if self._raised is not None:
+            text += f" (raised {self._raised.__name__})"
+        return text
+
+
+def time_calls(yell, func=None, name=None, show=True):
+    """``@yell.timed`` or ``@yell.timed(name=..., show=False)``: run every call in a ``Span``."""
+    if func is None:
+        return lambda func: time_calls(yell, func, name=name, show=show)
+    import inspect
+    name = name or func.__qualname__
+
+    if not show and not inspect.iscoroutinefunction(func):
+        # no line and no nesting, so the span is inlined down to the timing: this is the one for hot functions
+        add = yell.timings.add
+
+        @functools.wraps(func)
+        def quiet_wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(name, perf_counter_ns() - start)
+        return quiet_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with Span(yell, name, show=show, depth=2):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Span(yell, name, show=show, depth=2):
+            return func(*args, **kwargs)
+    return wrapper
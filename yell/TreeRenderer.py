@@ -0,0 +1,143 @@
+import itertools
+from .StyledText import StyledText
+from .Theme import theme
+
+
+class _Level:
+    """One open container on the renderer's stack."""
+    __slots__ = ("container", "is_dict", "items", "prefix", "squib", "hidden", "depth")
+
+    def __init__(self, container, is_dict, items, prefix, squib, hidden, depth):
+        self.container = container
+        self.is_dict = is_dict
+        self.items = items
+        self.prefix = prefix
+        self.squib = squib
+        self.hidden = hidden
+        self.depth = depth
+
+
+class TreeRenderer:
+    """Turns nested dicts and lists into the lines of a ``yell()`` tree, one at a time.
+
+    The walk keeps its own stack instead of recursing, so it is bounded by ``max_depth``
+    rather than Python's recursion limit, and ``lines()`` is a generator: nothing is held
+    beyond the containers currently open. Containers below ``max_depth`` are summarised
+    as ``{…3 keys}`` / ``[…12 items]``, only the first ``max_items`` entries of each
+    container are shown followed by ``… N more``, and output stops after ``max_lines``.
+    A container that contains itself is shown as ``{…cycle}`` / ``[…cycle]``. Any limit
+    can be None to turn it off.
+
+    ``style`` turns any other value into a ``StyledText``, or into a dict or list to draw
+    in its place (``TypeRegistry.render`` does both).
+    """
+
+    def __init__(self, style, indent="   ", width=80, max_depth=32, max_items=1_000, max_lines=10_000):
+        self.style = style
+        self.indent = indent
+        self.width = width
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_lines = max_lines
+
+    def lines(self, things):
+        """Yield the lines for every top-level thing, stopping at ``max_lines``."""
+        lines = itertools.chain.from_iterable(map(self.value, things))
+        if self.max_lines is None:
+            yield from lines
+            return
+        yield from itertools.islice(lines, self.max_lines)
+        if next(lines, None) is not None:
+            yield StyledText(" ").append(f"… stopped after {self.max_lines:,} lines", theme.none)
+
+    def value(self, value):
+        """Yield the lines for one top-level value."""
+        if isinstance(value, dict):
+            yield from self.walk(value, True)
+        elif isinstance(value, (list, tuple)):
+            yield from self.walk(value, False)
+        else:
+            shown = self.style(value)
+            if isinstance(shown, StyledText):
+                yield shown
+            else:
+                yield from self.value(shown)
+
+    def walk(self, root, is_dict):
+        ancestors = {id(root)}
+        stack = [self._open(root, is_dict, StyledText(), 1)]
+        while stack:
+            level = stack[-1]
+            item = next(level.items, _done)
+            if item is _done:
+                stack.pop()
+                ancestors.discard(id(level.container))
+                yield from self._close(level)
+                continue
+
+            if level.is_dict:
+                key, child = item
+            else:
+                child = item
+            if not isinstance(child, (dict, list)):
+                shown = self.style(child)
+                if isinstance(shown, StyledText):
+                    yield self._pair(level, key, shown) if level.is_dict else self._item(level, shown)
+                    continue
+                child = shown if isinstance(shown, dict) else list(shown)
+            elif level.is_dict and not child:
+                empty = StyledText("{}", theme.dict_div) if isinstance(child, dict) else StyledText("[]", theme.list_div)
+                yield self._pair(level, key, empty)
+                continue
+
+            child_is_dict = isinstance(child, dict)
+            stub = self._stub(child, child_is_dict, level.depth + 1, ancestors)
+            if stub is not None:
+                yield self._pair(level, key, stub) if level.is_dict else self._item(level, stub)
+                continue
+            if level.is_dict:
+                yield level.squib.copy().append(" ").append(key, theme.dict_key).append(" :")
+            ancestors.add(id(child))
+            stack.append(self._open(child, child_is_dict, level.prefix, level.depth + 1))
+
+    def _open(self, container, is_dict, parent_prefix, depth) -> _Level:
+        div = theme.dict_div if is_dict else theme.list_div
+        prefix = parent_prefix.copy().append(self.indent).append("|", div)
+        squib = prefix.copy().append("-", div) if is_dict else prefix
+        items = container.items() if is_dict else container
+        hidden = 0
+        if self.max_items is not None and len(container) > self.max_items:
+            hidden = len(container) - self.max_items
+            items = itertools.islice(items, self.max_items)
+        return _Level(container, is_dict, iter(items), prefix, squib, hidden, depth)
+
+    def _close(self, level):
+        div = theme.dict_div if level.is_dict else theme.list_div
+        if level.hidden:
+            yield self._item(level, StyledText(f"… {level.hidden:,} more", theme.none))
+        rule = "-" * (self.width - len(level.squib) - len(self.indent))
+        yield level.squib.copy().append(rule, div)
+
+    def _stub(self, child, is_dict, depth, ancestors):
+        """What to show instead of ``child`` if it can't be opened, else None."""
+        open_, close = ("{", "}") if is_dict else ("[", "]")
+        if id(child) in ancestors:
+            return StyledText(f"{open_}…cycle{close}", theme.none)
+        if self.max_depth is not None and depth > self.max_depth:
+            what = "keys" if is_dict else "items"
+            return StyledText(f"{open_}…{len(child):,} {what}{close}", theme.none)
+        return None
+
+    @staticmethod
+    def _pair(level, key, value) -> StyledText:
+        return level.squib.copy().append(" ").append(key, theme.dict_key).append(": ").extend(value)
+
+    @staticmethod
+    def _item(level, value) -> StyledText:
+        squib = level.squib.copy()
+        if not level.is_dict:
+            squib.append("-", theme.list_div)
+        return squib.append(" ").extend(value)
+
+
+_done = object()
@@ -0,0 +1,70 @@
+from .AnsiColors import AnsiColors
+from .StyledText import StyledText
+
+
+class TypeRegistry:
+    """Decides how values are drawn in a ``yell()`` tree, by type.
+
+    Each registered type has a color, a renderer, or both. The renderer gets the value and
+    returns what to show: a string or ``StyledText`` for a one-line leaf (strings take the
+    registered color), or a dict or list to draw as a subtree, which is how a renderer can
+    give a cheap summary of an expensive object.
+
+    Which registration applies to a type is worked out the first time a value of that
+    exact type is seen: the nearest class in its MRO wins, then abstract base classes like
+    ``numbers.Number`` in registration order, then the ``resolvers``. The answer is cached,
+    so every later value costs one dict lookup. Registering or unregistering a type clears
+    the cache.
+
+        types.register(Decimal, color="bright_green")
+        types.register(Model, renderer=lambda model: {"id": model.id, "state": model.state})
+    """
+    _plain = (None, None)
+
+    def __init__(self):
+        self._registered = {}
+        self._resolved = {}
+        # called with a type none of the registrations matched; may return (color, renderer)
+        self.resolvers = []
+
+    def register(self, cls, color=None, renderer=None):
+        if color is not None and not AnsiColors.is_valid(color):
+            raise ValueError(f"unknown color {color!r} for {cls.__name__}")
+        self._registered[cls] = (color, renderer)
+        self._resolved.clear()
+
+    def unregister(self, cls):
+        self._registered.pop(cls, None)
+        self._resolved.clear()
+
+    def render(self, value):
+        """``value`` as a ``StyledText``, or the dict or list a renderer returned for it."""
+        kind = type(value)
+        try:
+            color, renderer = self._resolved[kind]
+        except KeyError:
+            color, renderer = self._resolved[kind] = self.resolve(kind)
+        if renderer is None:
+            return StyledText(value, color)
+        shown = renderer(value)
+        if isinstance(shown, (StyledText, dict, list, tuple)):
+            return shown
+        return StyledText(shown, color)
+
+    def resolve(self, kind) -> tuple:
+        """The ``(color, renderer)`` that applies to ``kind``, without the cache."""
+        registered = self._registered
+        for klass in kind.__mro__:
+            if klass in registered:
+                return registered[klass]
+        for klass, entry in registered.items():
+            if issubclass(kind, klass):
+                return entry
+        for resolver in self.resolvers:
+            entry = resolver(kind)
+            if entry is not None:
+                return entry
+        return self._plain
+
+    def cache_info(self) -> dict:
+        return {"registered": len(self._registered), "resolved": len(self._resolved)}
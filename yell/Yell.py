@@ -1,42 +1,242 @@
-import numbers
+import atexit
+import contextvars
+import itertools
 import os
-import inspect
-import textwrap
+import sys
+import threading
+import time
+import weakref
 from .YellCaller import YellCaller
+from .FrameCapture import FrameCapture
+from .Callsite import CallsiteTable
+from .ModuleRules import ModuleRules
+from .RateLimit import RateLimit
+from .Levels import Levels
+from .Record import Record
+from .Lazy import Lazy
+from .Timings import Timings, Span, time_calls
 from .ColorTools import ColorTools
+from .StyledText import StyledText
+from .TreeRenderer import TreeRenderer
+from .TypeRegistry import TypeRegistry
+from .ArraySummary import ArraySummary
+from .AnsiWrap import AnsiWrap
 from .Theme import theme
 
+_instances = weakref.WeakSet()
+# held for each whole message, including every chunk of a streamed one, so threads can't interleave lines
+_write_lock = threading.RLock()
+
+
+def _reinit_after_fork():
+    global _write_lock
+    # another thread may have held it at the fork, and that thread doesn't exist in the child
+    _write_lock = threading.RLock()
+    for instance in list(_instances):
+        instance._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+class _Nesting:
+    """What ``yell.nested()`` returns: raises the nesting depth for a ``with`` block."""
+    __slots__ = ("depth", "levels", "token")
+
+    def __init__(self, depth, levels):
+        self.depth = depth
+        self.levels = levels
+        self.token = None
+
+    def __enter__(self):
+        self.token = self.depth.set(self.depth.get() + self.levels)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.depth.reset(self.token)
+        return False
+
 
 class Yell:
     tools = ColorTools()
-    wrapper = textwrap
-    # wrapper = textwrap.TextWrapper()
+    frames = FrameCapture()
+    callsites = CallsiteTable()
+    wrapper = AnsiWrap()
+    # yell.lazy(func, *args) defers an expensive argument until the call is known to print
+    lazy = Lazy
+    # dotted module name -> YellCaller, with settings from the rules that match it
     _registry = {}
-    custom_class_a = None
-    custom_class_b = None
-    custom_class_c = None
+    _rules = ModuleRules()
 
-    custom_color_a = None
-    custom_color_b = None
-    custom_color_c = None
+    boxes = {
+        "success": ("heavy", "success", "SUCCESS"),
+        "warning": ("heavy", "warning", "WARNING"),
+        "error": ("heavy", "error", "ERROR"),
+        "failure": ("heavy", "failure", "FAILURE"),
+        "info": ("round", "info", "INFO"),
+        "debug": ("sharp", "debug", "DEBUG"),
+    }
 
     def __init__(self, width=80, indent=3):
-        self.width = width
-        self.indent = ' ' * indent
-        self.should_truncate = False
-        self.should_wrap = True
-        self.all_quiet = False
-        self.use_theme = True
-        self._last = None
-        self.load_config()
+        # settings yell_config.py can change; they only become attributes once it's been read, see __getattr__
+        self._defaults = dict(width=width, indent=' ' * indent, should_truncate=False, should_wrap=True,
+                              max_depth=32, max_items=1_000, max_lines=10_000, limit_summary_interval=10.0,
+                              use_theme=True)
+        self.stream_batch = 1_000
+        self._limited = []
+        self._summarized = time.monotonic()
+        self._all_quiet = False
+        self._level = Levels.all
+        self._floor = Levels.all
+        # per thread and per asyncio task, so concurrent flows don't see each other's calls
+        self._last = contextvars.ContextVar(f"yell_last_{id(self)}", default=None)
+        self._depth = contextvars.ContextVar(f"yell_depth_{id(self)}", default=0)
+        self.writer = None
+        self._aio = None
+        self.aggregator = None
+        self.forward = None
+        self.recorder = None
+        self.binary_log = None
+        self.repeats = None
+        self.json = None
+        self.timings = Timings()
+        self.self_stats = None
+        self.types = TypeRegistry()
+        _instances.add(self)
+        # yell_config.py is read, and the first call's own setup done, by _configure on first use
+        self._configured = False
+        self.handle_caller = self._handle_first_call
+
+    def __setattr__(self, name, value):
+        # settings made before first use have to land on top of yell_config.py, not under it
+        if self.__dict__.get("_configured", True) is False and not name.startswith("_") and name != "handle_caller":
+            self._configure()
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # only reached for attributes that aren't set, which the settings aren't until yell_config.py is read
+        defaults = self.__dict__.get("_defaults")
+        if defaults is not None and name in defaults:
+            self._configure()
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _configure(self):
+        """Read ``yell_config.py`` and finish setting up. Runs once, on first use.
+
+        ``_configured`` is None while the file is being applied. If it raises, the error
+        comes out of whatever triggered it, and the next use tries again.
+        """
+        if self._configured is not False:
+            return
+        self._configured = None
+        self.__dict__.pop("handle_caller", None)
+        defaults = self.__dict__.pop("_defaults")
+        self.__dict__.update(defaults)
+        try:
+            self._register_builtin_types()
+            self.load_config()
+        except BaseException:
+            # back to unconfigured, so reading a setting or the next call loads it all again
+            for name in defaults:
+                self.__dict__.pop(name, None)
+            self._defaults = defaults
+            self._configured = False
+            self.handle_caller = self._handle_first_call
+            raise
+        self._configured = True
+
+    def _handle_first_call(self, level=None, depth=2, kwargs=None):
+        self._configure()
+        return self.handle_caller(level, depth=depth + 1, kwargs=kwargs)
+
+    @property
+    def aio(self):
+        """The awaitable facade, see ``YellAio``. asyncio is only imported when it's first used."""
+        if self._aio is None:
+            from .YellAio import YellAio
+            self._aio = YellAio(self)
+        return self._aio
+
+    @property
+    def all_quiet(self):
+        self._configure()
+        return self._all_quiet
+
+    @all_quiet.setter
+    def all_quiet(self, value):
+        self._all_quiet = value
+        self._refresh_floor()
+
+    @property
+    def format(self):
+        """``"pretty"`` for boxes and trees, ``"json"`` for one JSON object per line, see ``JsonLines``."""
+        self._configure()
+        return "pretty" if self.json is None else "json"
+
+    @format.setter
+    def format(self, value):
+        if value not in ("pretty", "json"):
+            raise ValueError(f"unknown format {value!r}, expected 'pretty' or 'json'")
+        if value == "pretty":
+            self.json = None
+        elif self.json is None:
+            from .JsonLines import JsonLines
+            self.json = JsonLines()
+
+    @property
+    def level(self):
+        """The global minimum severity, used by modules that don't set their own."""
+        self._configure()
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = Levels.to_level(value)
+        self._refresh_floor()
+
+    def set_level(self, level, module=None):
+        """Set the minimum severity globally, or for the modules matching ``module`` when it's given.
+        ``module`` takes the same names and patterns as the ``modules`` config, e.g. ``"myapp.db.*"``."""
+        if module is None:
+            self.level = level
+            return
+        self._configure()
+        self._rules.update(module, level=Levels.to_level(level))
+        self._apply_rules()
+        self._refresh_floor()
+
+    def _apply_rules(self):
+        """Bring every known module's caller in line with the rules after they change."""
+        for name, caller in list(self._registry.items()):
+            caller.configure(**(self._rules.match(name) or {}))
+
+    def _refresh_floor(self):
+        """Lowest severity anything could print at, so calls below it return before any introspection."""
+        if self._all_quiet and self.recorder is None:
+            self._floor = float("inf")
+            return
+        module_levels = [c.level for c in self._registry.values() if c.level is not None]
+        module_levels += [Levels.to_level(level) for level in self._rules.levels()]
+        self._floor = min([self._level, *module_levels])
+
+    def _enabled(self, caller, level) -> bool:
+        if not caller.on:
+            return False
+        threshold = self._level if caller.level is None else caller.level
+        return level >= threshold
 
 
     def load_config(self):
         def register_modules(the_modules):
             if not the_modules: return
             for key, vals in the_modules.items():
-                m = YellCaller(name=key, **vals)
-                self._registry[key] = m
+                unknown = set(vals).difference(YellCaller.settings)
+                if unknown:
+                    raise ValueError(f"unknown settings for module {key!r}: {', '.join(sorted(unknown))}")
+                self._rules.add(key, vals)
+            self._apply_rules()
 
         config_dict = {}
         if os.path.exists("yell_config.py"):
@@ -48,44 +248,370 @@ class Yell:
         self.should_wrap = config_dict.get('wrap', self.should_wrap)
         self.should_truncate = config_dict.get('truncate', self.should_truncate)
         self.indent = config_dict.get('indent', self.indent)
+        self.max_depth = config_dict.get('max_depth', self.max_depth)
+        self.max_items = config_dict.get('max_items', self.max_items)
+        self.max_lines = config_dict.get('max_lines', self.max_lines)
+        self.limit_summary_interval = config_dict.get('limit_summary_interval', self.limit_summary_interval)
+        if config_dict.get('collapse_repeats', False):
+            self.collapse_repeats(window=config_dict.get('repeat_window', 5.0))
         self.all_quiet = config_dict.get('all_quiet', False)
+        self.level = config_dict.get('level', self._level)
         self.use_theme = config_dict.get('use_theme', True)
+        self.format = config_dict.get('format', self.format)
+        self.frames.with_source = config_dict.get('capture_source', False)
+        self_stats = config_dict.get('self_stats')
+        if self_stats:
+            self.enable_stats(interval=None if self_stats is True else self_stats)
+        if config_dict.get('binary_log'):
+            self.enable_binary_log(config_dict['binary_log'])
+        flight_recorder = config_dict.get('flight_recorder')
+        if flight_recorder:
+            self.enable_flight_recorder(**(flight_recorder if isinstance(flight_recorder, dict) else {}))
+        if config_dict.get('async', False):
+            self.enable_async(
+                maxsize=config_dict.get('queue_size', 10_000),
+                policy=config_dict.get('queue_policy', 'block'),
+                sample_rate=config_dict.get('sample_rate', 10),
+            )
 
         if not self.use_theme: self.tools.disable_color()
-        # if self.should_wrap: self.wrapper.width = self.width
 
-        self.custom_class_a = config_dict.get('custom_class_a')
-        self.custom_color_a = config_dict.get('custom_color_a')
-        self.custom_class_b = config_dict.get('custom_class_b')
-        self.custom_color_b = config_dict.get('custom_color_b')
-        self.custom_class_c = config_dict.get('custom_class_c')
-        self.custom_color_c = config_dict.get('custom_color_c')
+        for slot in ("a", "b", "c"):
+            cls = config_dict.get(f'custom_class_{slot}')
+            if cls is not None:
+                self.register_type(cls, color=config_dict.get(f'custom_color_{slot}'))
 
         modules = config_dict.get('modules', {})
         register_modules(modules)
+        self.callsites.clear()
+        self._refresh_floor()
 
     def tracer(self, lvl=1):
         size = lvl
         h = int(size / 2)
-        d = self.tools.dash(theme.dash) * h
-        cap = self.tools.pipe(theme.primary)
-        return f"{d}{self.tools.pipe(theme.pipe)}{d}{cap}"
+        d = self.tools.fragment("-" * h, theme.dash)
+        cap = self.tools.fragment("|", theme.primary)
+        return f"{d}{self.tools.fragment('|', theme.pipe)}{d}{cap}"
+
+    def tracer_text(self, lvl=1) -> StyledText:
+        """``tracer`` as a ``StyledText``, for lines whose width still needs checking."""
+        h = int(lvl / 2)
+        return (StyledText("-" * h, theme.dash).append("|", theme.pipe)
+                .append("-" * h, theme.dash).append("|", theme.primary))
 
-    def be_heard(self, *args, **kwargs):
+    def be_heard(self, *args, when=None, **kwargs):
         we_can_yell = not self.all_quiet
         if we_can_yell:
-            show_timestamp = kwargs.pop('show_timestamp', True)
-            if show_timestamp:
-                print(self.tools.timestamp(), *args, **kwargs)
-            else:
-                print(*args, **kwargs)
+            self.write(*self.to_text(*args, when=when, **kwargs))
+
+    def to_text(self, *args, when=None, **kwargs) -> tuple:
+        """Lay out ``args`` the way ``print`` would. Returns ``(text, file, flush)``."""
+        chunks, file, flush = self.to_chunks(args, when=when, **kwargs)
+        return "".join(chunks), file, flush
+
+    def to_chunks(self, lines, when=None, **kwargs) -> tuple:
+        """``to_text`` for an iterable of lines that may be too long to hold at once.
+
+        Returns ``(chunks, file, flush)``, where ``chunks`` is a generator of strings of
+        at most ``stream_batch`` lines each. Lines are only rendered as chunks are taken.
+        """
+        show_timestamp = kwargs.pop('show_timestamp', True)
+        sep = kwargs.pop('sep', ' ')
+        end = kwargs.pop('end', '\n')
+        file = kwargs.pop('file', None)
+        flush = kwargs.pop('flush', False)
+        if not self._configured:
+            self._configure()
+        if show_timestamp:
+            lines = itertools.chain([self.tools.timestamp(when)], lines)
+
+        def chunks():
+            lead = ""
+            batch = []
+            for line in lines:
+                batch.append(str(line))
+                if len(batch) >= self.stream_batch:
+                    yield lead + sep.join(batch)
+                    lead = sep
+                    batch = []
+            yield (lead + sep.join(batch) if batch else "") + end
+
+        return chunks(), file, flush
+
+    @staticmethod
+    def write(text, file=None, flush=False):
+        file = file or sys.stdout
+        with _write_lock:
+            file.write(text)
+            if flush:
+                file.flush()
+
+    def enable_async(self, maxsize=10_000, policy="block", sample_rate=10):
+        """Render and write on a background thread; calls only capture a ``Record``.
+
+        ``policy`` picks what happens when ``maxsize`` records are already waiting:
+        ``"block"``, ``"drop"`` or ``"sample"`` (keep one in ``sample_rate``).
+        """
+        self.disable_async()
+        from .BackgroundWriter import BackgroundWriter
+        self.writer = BackgroundWriter(
+            self.render, maxsize=maxsize, policy=policy, sample_rate=sample_rate,
+            notice=lambda message: self.be_heard(message, show_timestamp=False, file=sys.stderr),
+        ).start()
+        return self.writer
+
+    def disable_async(self):
+        """Write out anything still queued and go back to rendering on the calling thread."""
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+
+    def flush(self):
+        """Write out held repeats and wait until every deferred record has been written."""
+        if self.repeats is not None:
+            self.repeats.flush()
+        if self.writer is not None:
+            self.writer.flush()
+        if self.binary_log is not None:
+            self.binary_log.flush()
+
+    def collapse_repeats(self, window=5.0):
+        """Print a run of identical messages from one call site once, then ``repeated N times over Xs``."""
+        if self.repeats is None:
+            from .RepeatCollapser import RepeatCollapser
+            self.repeats = RepeatCollapser(self._deliver, window=window)
+            atexit.register(self.repeats.flush)
+        self.repeats.window = window
+        return self.repeats
+
+    def stop_collapsing_repeats(self):
+        repeats, self.repeats = self.repeats, None
+        if repeats is not None:
+            atexit.unregister(repeats.flush)
+            repeats.flush()
+
+    def aggregate(self, address=None, context=None):
+        """Become the process that writes for every worker. See ``Aggregator``."""
+        if self.aggregator is None:
+            from .Aggregator import Aggregator
+            self.aggregator = Aggregator(self, address=address, context=context).start()
+        return self.aggregator
+
+    def attach(self, target):
+        """Send records to the ``Aggregator`` behind ``target`` (its queue or socket path).
+
+        Pool workers can use ``Aggregator.pool_kwargs()`` to do this in their initializer.
+        """
+        from .Aggregator import Forwarder
+        self.detach()
+        self.forward = Forwarder(target)
+
+    def detach(self):
+        forward, self.forward = self.forward, None
+        if forward is not None:
+            forward.close()
+
+    def _after_fork(self):
+        # threads don't survive fork and their locks may have been held mid-operation
+        if self.writer is not None:
+            self.writer.after_fork()
+        if self._aio is not None:
+            self._aio.after_fork()
+        if self.repeats is not None:
+            self.repeats.after_fork()
+        self.timings.after_fork()
+        if self.binary_log is not None:
+            self.binary_log.after_fork()
+        if self.recorder is not None:
+            self.recorder.after_fork()
+        if self.aggregator is not None:
+            from .Aggregator import Forwarder
+            aggregator, self.aggregator = self.aggregator, None
+            self.forward = Forwarder(aggregator.target)
+        elif self.forward is not None:
+            from .Aggregator import Forwarder
+            self.forward = Forwarder(self.forward.target)
+
+    def enable_stats(self, interval=None):
+        """Measure Yell's own work per phase, for ``stats()``. See ``SelfStats``.
+
+        With ``interval``, a summary line goes to stderr every ``interval`` seconds.
+        Nothing is measured, and nothing is paid, until this is called.
+        """
+        from .SelfStats import SelfStats
+        # configured first, or setting self_stats would run _configure and drop the wrappers
+        self._configure()
+        self.disable_stats()
+        report = lambda line: self.be_heard(StyledText(line), show_timestamp=False, file=sys.stderr)
+        self.self_stats = SelfStats(interval=interval, report=report).install(self)
+        return self.self_stats
+
+    def disable_stats(self):
+        self_stats, self.self_stats = self.self_stats, None
+        if self_stats is not None:
+            self_stats.uninstall(self)
+
+    def stats(self) -> dict:
+        """Calls, total and mean ns, and share of the time for each phase, since ``enable_stats()``."""
+        if self.self_stats is None:
+            return {}
+        return self.self_stats.summary()
+
+    def enable_binary_log(self, path, buffer_size=1 << 20):
+        """Write records to a compact binary file at ``path`` instead of rendering them.
+
+        Rendering happens later, with ``python -m yell render path``. See ``BinaryLog``.
+        """
+        from .BinaryLog import BinaryLog
+        self.disable_binary_log()
+        self.binary_log = BinaryLog(path, buffer_size=buffer_size)
+        atexit.register(self.binary_log.close)
+        return self.binary_log
+
+    def disable_binary_log(self):
+        binary_log, self.binary_log = self.binary_log, None
+        if binary_log is not None:
+            atexit.unregister(binary_log.close)
+            binary_log.close()
+
+    def enable_flight_recorder(self, size=1000, path=None, dump_signal="SIGUSR1", on_crash=True, **limits):
+        """Keep the last ``size`` records in a ring buffer, even under ``all_quiet``.
+
+        The buffer is written out through the normal renderers by ``yell.dump()``, on
+        ``dump_signal`` and, with ``on_crash``, on an unhandled exception. ``path`` backs the
+        ring with an mmap'd file that outlives the process; see ``FlightRecorder``.
+        """
+        import signal
+        from .FlightRecorder import FlightRecorder
+        if self.recorder is not None:
+            self.recorder.close()
+        self.recorder = FlightRecorder(size=size, path=path, **limits)
+        self._refresh_floor()
+        if on_crash:
+            self._install_crash_hooks()
+        if dump_signal and hasattr(signal, str(dump_signal)):
+            try:
+                signal.signal(getattr(signal, dump_signal), lambda signum, frame: self.dump())
+            except ValueError:
+                pass  # not the main thread
+        return self.recorder
+
+    def disable_flight_recorder(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+        self._refresh_floor()
+
+    def dump(self, file=None, path=None):
+        """Render the flight recorder's records, or those left in the file at ``path``.
+
+        Ignores ``all_quiet``: asking for a dump means you want to see it.
+        """
+        if path is not None:
+            from .FlightRecorder import FlightRecorder
+            records = FlightRecorder.load(path)
+            total = len(records)
+        elif self.recorder is not None:
+            records = self.recorder.records()
+            total = self.recorder.total
+        else:
+            return
+        file = file or sys.stderr
+        heading = f"{self.tools.color('flight recorder', theme.warning)}: last {len(records):,} of {total:,} records"
+        self.write(*self.to_text(heading, show_timestamp=False, file=file))
+        for record in records:
+            try:
+                text, _, _ = self.render_text(record)
+            except Exception as e:
+                text = f"yell: failed to render {record!r}: {e}\n"
+            self.write(text, file, True)
+
+    def _install_crash_hooks(self):
+        if getattr(self, '_crash_hooks', False):
+            return
+        self._crash_hooks = True
+        previous_excepthook = sys.excepthook
+        previous_thread_hook = threading.excepthook
+
+        def excepthook(exc_type, exc, tb):
+            if self.recorder is not None:
+                self.dump()
+            previous_excepthook(exc_type, exc, tb)
+
+        def thread_excepthook(args):
+            if self.recorder is not None:
+                self.dump()
+            previous_thread_hook(args)
+
+        sys.excepthook = excepthook
+        threading.excepthook = thread_excepthook
+
+    def emit(self, record):
+        if self.repeats is not None and self.repeats.offer(record):
+            return
+        self._deliver(record)
+
+    def _deliver(self, record):
+        if self.recorder is not None:
+            self.recorder.add(record)
+            if self._all_quiet:
+                return
+        if self.binary_log is not None:
+            self.binary_log.write(record)
+        elif self.forward is not None:
+            self.forward(record)
+        elif self.writer is not None:
+            self.writer.submit(record)
+        else:
+            self.render(record)
+
+    def render(self, record):
+        if self.all_quiet:
+            return
+        # big trees are written as they're rendered instead of being built up in memory first
+        chunks, file, flush = self.render_chunks(record)
+        chunks = iter(chunks)
+        first = next(chunks, "")
+        second = next(chunks, None)
+        if second is None:
+            # the usual case: rendered in one piece without holding the lock
+            self.write(first, file, flush)
+            return
+        with _write_lock:
+            self.write(first, file, flush)
+            self.write(second, file, flush)
+            for chunk in chunks:
+                self.write(chunk, file, flush)
+
+    def render_text(self, record) -> tuple:
+        """Render a record without writing it. Returns ``(text, file, flush)``."""
+        chunks, file, flush = self.render_chunks(record)
+        return "".join(chunks), file, flush
+
+    def render_chunks(self, record) -> tuple:
+        """Render a record lazily. Returns ``(chunks, file, flush)``, see ``to_chunks``."""
+        if not self._configured:
+            self._configure()
+        if self.json is not None:
+            return iter((self.json.line(record),)), record.kwargs.get("file"), record.kwargs.get("flush", False)
+        if record.kind == "yell":
+            return self.__shout(record)
+        if record.kind == "label":
+            text, file, flush = self.__label(record)
+        else:
+            corners, color, label = self.boxes[record.kind]
+            text, file, flush = self.__log(record, corners=corners, color=getattr(theme, color), label=label, **record.kwargs)
+        return iter((text,)), file, flush
 
     def find_ansi_offset(self, text):
         return self.tools.color_text.find_ansi_offset(str(text))
 
     def _width_ok(self, text, width=None) -> bool:
         width = width or self.width
-        visible_length = self.tools.color_text.find_length(str(text))
+        if isinstance(text, StyledText):
+            visible_length = len(text)
+        else:
+            visible_length = self.wrapper.visible_width(str(text))
         return visible_length <= width + len(self.indent)
 
     def truncate(self, text, width=None) -> str:
@@ -93,14 +619,13 @@ class Yell:
         width = width or self.width
         if self._width_ok(text, width):
             return text
-        offset = self.find_ansi_offset(text) + self.width - 1
-        text = f"{text:.{offset}}...{self.tools.color_text.ansi.end}"
-        return text
+        return self.wrapper.truncate(str(text), width)
 
     def wrap_text(self, text, width=None, **kwargs) -> list[str]:
         if self._width_ok(text, width):
             return [text]
-        return self.wrapper.wrap(str(text), width=width or self.width, subsequent_indent=" ↪ ", **kwargs)
+        kwargs.setdefault("subsequent_indent", " ↪ ")
+        return self.wrapper.wrap(str(text), width=width or self.width, **kwargs)
 
     def fill_text(self, text, width=None, **kwargs) -> str:
         if self._width_ok(text, width):
@@ -111,7 +636,7 @@ class Yell:
         width = width or self.width
         new_stuff = []
         for thing in stuff:
-            lines = str(thing).split("\n")
+            lines = thing.split("\n") if isinstance(thing, StyledText) else str(thing).split("\n")
             for line in lines:
                 if self._width_ok(line, width):
                     new_stuff.append(line)
@@ -120,19 +645,21 @@ class Yell:
         return new_stuff
 
     def wrap(self, user_line, flup_num=0):
-        buff = self.tools.flup(theme.flup) * flup_num
+        buff = self.tools.fragment("--|" * flup_num, theme.flup)
 
-        if self.should_truncate:
+        if self._width_ok(user_line):
+            pass  # fits as built, nothing to measure
+        elif self.should_truncate:
             user_line = self.truncate(user_line)
         elif self.should_wrap:
-            self.wrapper.width = self.width + self.find_ansi_offset(user_line)
             user_line = self.fill_text(user_line)
 
         return f"{self.tracer(flup_num)}{buff}{user_line}"
 
-    def __log(self, things, caller, width=75, corners="sharp", color=theme.primary, label="", **kwargs):
+    def __log(self, record, width=75, corners="sharp", color=theme.primary, label="", **kwargs):
+        things = record.args
         width = width if self.width > 75 else self.width
-        def color_func(a_thing): return self.tools.color(a_thing, color=color)
+        def color_func(a_thing): return StyledText(a_thing, color)
 
         def box_it(*stuff, color_func_=None, align="<", corners_):
             align = kwargs.pop("align", align)
@@ -141,226 +668,269 @@ class Yell:
             bottom_line = corners_[3] + ("-" * width) + corners_[2]
             split_up = [i.split("\n") for i in stuff]
             split_up = [item for sublist in split_up for item in sublist]
-            lines = [f"|{thing:{align}{width}}|" for thing in split_up]
+            lines = [f"|{self.wrapper.pad(str(thing), width, align)}|" for thing in split_up]
             all_the_stuff = [top_line, *lines, bottom_line]
             all_the_stuff = [color_func_(i) for i in all_the_stuff]
-            all_the_stuff = [self.wrap(i, flup_num=caller.lvl) for i in all_the_stuff]
+            all_the_stuff = [self.wrap(i, flup_num=record.lvl) for i in all_the_stuff]
             return all_the_stuff
         def make_call_chain(prefix):
-            def white(a_thing):
-                return self.tools.color(a_thing).white()
-
-            def bright_white(a_thing):
-                return self.tools.color(a_thing).bright_white()
+            line_no = StyledText(" ").append("line", "bright_white").append(" ").append("#", "white").append(record.lineno, "bright_white")
+            assembled = prefix.append(" ").append("stack:", "white")
 
-            line_no = f" {bright_white('line')} {white('#')}{bright_white(caller.lineno)}"
-            call_chain = [*caller.last_stack, line_no]
-            assembled = [prefix, white("stack:")]
-            num = len(call_chain) - 1
+            for i in record.stack:
+                assembled.append(" ").append(i, "bright_white").append(" ").append("=>", "white")
+            assembled.append(" ").extend(line_no)
 
-            for i in call_chain:
-                assembled.append(bright_white(i))
-                if call_chain.index(i) >= num: continue
-                assembled.append(white("=>"))
-
-            almost_done = ' '.join([str(ass) for ass in assembled])
-            return self.wrap(almost_done, flup_num=caller.lvl)
+            return self.wrap(assembled, flup_num=record.lvl)
 
         fit = self.conform_width(*things, width=width)
         boxed = box_it(*fit, color_func_=color_func, corners_=corners)
         use_call_chain = kwargs.pop("use_call_chain", True)
         if not use_call_chain:
-            return self.be_heard(*boxed, sep='\n', **kwargs)
-        chain = make_call_chain(prefix=f"-{color_func(label)}- ")
-        self.be_heard(chain, *boxed, sep='\n', **kwargs)
+            return self.to_text(*boxed, sep='\n', when=record.timestamp, **kwargs)
+        chain = make_call_chain(prefix=StyledText("-").append(label, color).append("- "))
+        return self.to_text(chain, *boxed, sep='\n', when=record.timestamp, **kwargs)
 
     def success(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="heavy", color=theme.success, label="SUCCESS", **kwargs)
+        if Levels.success < self._floor: return
+        caller = self.handle_caller(Levels.success, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("success", things, kwargs, caller))
 
     def warning(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="heavy", color=theme.warning, label="WARNING", **kwargs)
+        if Levels.warning < self._floor: return
+        caller = self.handle_caller(Levels.warning, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("warning", things, kwargs, caller))
 
     def error(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="heavy", color=theme.error, label="ERROR", **kwargs)
+        if Levels.error < self._floor: return
+        caller = self.handle_caller(Levels.error, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("error", things, kwargs, caller))
 
     def failure(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="heavy", color=theme.failure, label="FAILURE", **kwargs)
+        if Levels.failure < self._floor: return
+        caller = self.handle_caller(Levels.failure, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("failure", things, kwargs, caller))
 
     def info(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="round", color=theme.info, label="INFO", **kwargs)
+        if Levels.info < self._floor: return
+        caller = self.handle_caller(Levels.info, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("info", things, kwargs, caller))
 
     def debug(self, *things, width=75, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        self.__log(things, caller, width=width, corners="sharp", color=theme.debug, label="DEBUG", **kwargs)
+        if Levels.debug < self._floor: return
+        caller = self.handle_caller(Levels.debug, kwargs=kwargs)
+        if caller is None: return
+        kwargs['width'] = width
+        self.emit(self._record("debug", things, kwargs, caller))
 
     def label(self, text, lvl=0, func_trace: str = None, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
-        file = self.tools.color(caller.name, color=theme.primary)
-        caller_name = self.tools.color(caller.last_called_func, color=theme.secondary)
-        call_count = self.tools.color(caller.get_func_call_count(caller_name), color=theme.failure)
-        func_trace = f" {file}.{caller_name}() : {call_count}" if func_trace is None else self.tools.color(func_trace,
-                                                                                                           color=theme.secondary)
-        stuff = self.tools.color(text, color=theme.label)
-
-        line = f"{self.tracer(lvl=lvl)}{self.tools.arrow_right}  -[ {stuff} ]-  {self.tools.arrow_left} {func_trace}"
+        if Levels.debug < self._floor: return
+        caller = self.handle_caller(Levels.debug, kwargs=kwargs)
+        if caller is None: return
+        kwargs.update(lvl=lvl, func_trace=func_trace)
+        self.emit(self._record("label", (text,), kwargs, caller))
+
+    def __label(self, record):
+        kwargs = dict(record.kwargs)
+        text = record.args[0]
+        lvl = kwargs.pop('lvl', 0)
+        func_trace = kwargs.pop('func_trace', None)
+        if func_trace is None:
+            func_trace = (StyledText(" ").append(record.module, theme.primary).append(".")
+                          .append(record.function, theme.secondary).append("() : ").append(record.func_count, theme.failure))
+        else:
+            func_trace = StyledText(func_trace, theme.secondary)
+
+        line = (self.tracer_text(lvl).append("=>", "white").append("  -[ ").append(text, theme.label)
+                .append(" ]-  ").append("<=", "white").append(" ").extend(func_trace))
         thing = self.wrap(line, flup_num=lvl)
-        self.be_heard(thing, sep='\n', **kwargs)
-
-    def __user_stuff(self, the_stuff, is_loop=False, lvl=0):
-        bucket = []
-        def drop_in(drip):
-            bucket.append(f"{self.tools.flup(theme.flup) * lvl} {drip}") if is_loop else bucket.append(f" {drip}")
-
-        def make_plunge(plunge_list):
-            return ''.join(plunge_list)
-
-        def handle_custom_classes(some_thing):
-            colors = self.tools.color_text.ansi
-            if self.custom_class_a is not None:
-                if isinstance(some_thing, self.custom_class_a) and colors.is_valid(self.custom_color_a):
-                    return self.tools.color(some_thing, color=self.custom_color_a)
-            if self.custom_class_b is not None:
-                if isinstance(some_thing, self.custom_class_b) and colors.is_valid(self.custom_color_b):
-                    return self.tools.color(some_thing, color=self.custom_color_b)
-            if self.custom_class_c is not None:
-                if isinstance(some_thing, self.custom_class_c) and colors.is_valid(self.custom_color_c):
-                    return self.tools.color(some_thing, color=self.custom_color_c)
-            return some_thing
-
-        def handle_non_iterator(some_thing):
-            if isinstance(some_thing, str):
-                return self.tools.color(some_thing, color=theme.string)
-            elif isinstance(some_thing, bool):
-                return self.tools.color(some_thing, color=theme.boolean)
-            elif isinstance(some_thing, numbers.Number):
-                return self.tools.color(some_thing, color=theme.number)
-            elif some_thing is None:
-                return self.tools.color("None", color=theme.none)
-            else:
-                return handle_custom_classes(some_thing)
-
-        def handle_dict(dict_drip, plunger):
-            dict_div = self.tools.pipe(color=theme.dict_div)
-            plunge = f"{self.indent}{dict_div}"
-            plunger.append(plunge)
-            squib = f"{make_plunge([*plunger])}{self.tools.dash(theme.dict_div)}"
-
-            def drop_key(some_thing):
-                drop_in(f"{squib} {self.tools.color(some_thing, theme.dict_key)} :")
-
-            for pair in dict_drip.items():
-                key, val = pair
-                if isinstance(val, dict):
-                    if not val: val = self.tools.color("{}", theme.dict_div)
-                    else:
-                        drop_key(key)
-                        handle_dict(val, plunger=[*plunger])   
-                        continue 
-                elif isinstance(val, list):
-                    if not val: val = self.tools.color("[]", theme.list_div)
-                    else:
-                        drop_key(key)
-                        handle_list(val, plunger=[*plunger])
-                        continue
-
-                drop_in(f"{squib} {self.tools.color(key, theme.dict_key)}: {handle_non_iterator(val)}")
-            squib_len = self.tools.color_text.find_length(squib)
-            drop_in(f"{squib}{self.tools.div(length=self.width - squib_len - len(self.indent), color=theme.dict_div)}")
-
-        def handle_list(user_list, plunger):
-            plunge = f"{self.indent}{self.tools.pipe(color=theme.list_div)}"
-            plunger.append(plunge)
-            my_plunger = [*plunger]
-            squib = make_plunge(plunge_list=my_plunger)
-
-            for item in user_list:
-                if isinstance(item, list):
-                    handle_list(item, plunger=[*plunger])
-                elif isinstance(item, dict):
-                    handle_dict(item, plunger=[*plunger])
-                else:
-                    drop_in(f"{squib}{self.tools.dash(theme.list_div)} {handle_non_iterator(item)}")
-            squib_len = self.tools.color_text.find_length(squib)
-            drop_in(f"{squib}{self.tools.div(length=self.width - squib_len - len(self.indent), color=theme.list_div)}")
-
-        def handle_value(value, plunger):
-            if isinstance(value, dict):
-                handle_dict(value, plunger)
-            elif isinstance(value, (list, tuple)):
-                handle_list(value, plunger)
-            else:
-                drop_in(handle_non_iterator(value))
-
-        for thing in the_stuff:
-            handle_value(thing, [])
-
-        return bucket
-
-    def handle_caller(self):
-        stuff = inspect.stack()
-        stack_obj = stuff[2]
-
-        def get_basename(fp):
-            fn = os.path.basename(fp)
-            return fn
-        def get_func(f):
-            the_thing = f.function
-            if the_thing == "<module>":
-                the_thing = get_basename(f.filename)
-            else:
-                the_thing = f"{the_thing}()"
-            return the_thing
-        def get_call_chain(fr):
-            outers = inspect.getouterframes(fr)
-            return [get_func(i) for i in outers]
-        def inform_caller(c:YellCaller):
-            c.inc_call_count()
-            c.last_called_func = stack_obj.function
-            c.last_stack = get_call_chain(stack_obj.frame)[::-1]
-            c.lineno = stack_obj.lineno
-            c.code_context = stack_obj.code_context
-            c.log_func(c.last_called_func)
-            return c
-
-        filename = get_basename(stack_obj.filename)
-        module = filename[:-3]
+        return self.to_text(thing, sep='\n', when=record.timestamp, **kwargs)
+
+    def __user_stuff(self, the_stuff, is_loop=False, lvl=0, **limits):
+        limits = {name: limits.get(name, getattr(self, name)) for name in ("max_depth", "max_items", "max_lines")}
+        tree = TreeRenderer(self.style_value, indent=self.indent, width=self.width, **limits)
+        lead = StyledText("--|" * lvl, theme.flup) if is_loop else StyledText()
+        for line in tree.lines(the_stuff):
+            yield lead.copy().append(" ").extend(line)
+
+    def style_value(self, some_thing):
+        """Color a leaf value of a ``yell()`` tree by its type, see ``register_type``."""
+        return self.types.render(some_thing)
+
+    def register_type(self, cls, color=None, renderer=None):
+        """Draw values of ``cls`` (and its subclasses) in ``color``, or as ``renderer(value)`` returns them.
+
+        A renderer returns a string, a ``StyledText``, or a dict or list to show as a subtree.
+        """
+        self._configure()
+        self.types.register(cls, color=color, renderer=renderer)
+
+    def unregister_type(self, cls):
+        self._configure()
+        self.types.unregister(cls)
+
+    def _register_builtin_types(self):
+        import numbers
+        # renderers rather than colors, so they follow changes to the theme
+        types = self.types
+        types.register(StyledText, renderer=lambda text: text)
+        types.register(str, renderer=lambda text: StyledText(text, theme.string))
+        types.register(bool, renderer=lambda flag: StyledText(flag, theme.boolean))
+        types.register(numbers.Number, renderer=lambda number: StyledText(number, theme.number))
+        types.register(type(None), renderer=lambda _: StyledText("None", theme.none))
+        if ArraySummary.resolve not in types.resolvers:
+            types.resolvers.append(ArraySummary.resolve)
+
+    def _admit(self, site, limits, kwargs) -> bool:
+        """Apply the module's rate limits, overridden by any given for this call, to ``site``."""
+        if kwargs:
+            override = {name: kwargs.pop(name) for name in RateLimit.options if name in kwargs}
+            if override:
+                limits = {**limits, **override} if limits else override
+        if not limits:
+            return True
+        limit = site.limit
+        if limit is None or limit.spec != tuple(limits.get(name) for name in RateLimit.options):
+            if not self._limited:
+                atexit.register(self.report_suppressed)
+            if limit is None:
+                self._limited.append(site)
+            limit = site.limit = RateLimit(**limits)
+        now = time.monotonic()
+        if now - self._summarized >= self.limit_summary_interval:
+            self.report_suppressed(now)
+        return limit.allow(now)
+
+    def report_suppressed(self, now=None):
+        """Write one line per rate-limited call site that dropped calls since the last report."""
+        self._summarized = time.monotonic() if now is None else now
+        for site in list(self._limited):
+            limit = site.limit
+            suppressed = limit.take_suppressed() if limit is not None else 0
+            if suppressed:
+                self.be_heard(StyledText(
+                    f"yell: suppressed {suppressed:,} calls from {site.filename}:{site.lineno} "
+                    f"{site.function}() ({limit.describe()})", theme.none), show_timestamp=False)
+
+    def nested(self, levels=1) -> _Nesting:
+        """Draw everything yelled inside the block ``levels`` deeper.
+
+        The depth lives in a context variable, so it follows the current thread or asyncio
+        task, and tasks started inside the block inherit it.
+        """
+        return _Nesting(self._depth, levels)
+
+    def span(self, name, show=True) -> Span:
+        """``with yell.span("load config"):`` times the block and draws a line with its duration."""
+        return Span(self, name, show=show)
+
+    def timed(self, func=None, name=None, show=True):
+        """Decorator that times every call of a function (or coroutine function) in a ``span``.
+
+        Use it bare, ``@yell.timed``, or with options, ``@yell.timed(show=False)`` to only
+        collect numbers for ``timing_report``. ``name`` defaults to the function's qualified name.
+        """
+        return time_calls(self, func, name=name, show=show)
+
+    def timing_report(self, file=None) -> dict:
+        """Write a table of calls, total, min, mean, p95 and max per span name, slowest total first."""
+        summary = self.timings.summary()
+        if summary:
+            heading, *rows = self.timings.report()
+            self.write(*self.to_text(self.tools.color(heading, theme.label), *rows,
+                                     sep="\n", show_timestamp=False, file=file))
+        return summary
+
+    def _caller_for(self, module) -> YellCaller:
         caller = self._registry.get(module)
         if caller is None:
-            caller = YellCaller(name=module)
-            self._registry[module] = caller
-
-        assert isinstance(caller, YellCaller)
-        caller = inform_caller(caller)
+            # setdefault so two threads meeting a new module at once end up with the same caller
+            caller = self._registry.setdefault(module, YellCaller(name=module, **(self._rules.match(module) or {})))
         return caller
 
-    def __call__(self, *words, is_loop=False, loop_lvl:int=0, title:str=None, **kwargs):
-        caller = self.handle_caller()
-        if not caller.on: return
+    def cache_info(self) -> dict:
+        """Hit/miss counts for the interned call site table."""
+        return self.callsites.cache_info()
+
+    def capture(self, kind, args, kwargs, depth=1):
+        """Build the ``Record`` for a call made ``depth`` frames above this one's caller.
+
+        Returns None when the caller is filtered out by its switch or severity.
+        """
+        level = Levels.names.get(kind, Levels.debug)
+        if level < self._floor: return None
+        caller = self.handle_caller(level, depth=depth + 2, kwargs=kwargs)
+        if caller is None: return None
+        return self._record(kind, args, kwargs, caller)
+
+    def _record(self, kind, args, kwargs, caller) -> Record:
+        same_caller = False
+        if kind == "yell":
+            same_caller = self._last.get() is caller.caller
+            self._last.set(caller.caller)
+        elif kind == "label":
+            depth = self._depth.get()
+            if depth:
+                kwargs["lvl"] = kwargs.get("lvl", 0) + depth
+        # only calls that made it past every check get here, so deferred arguments are worked out now
+        args = Lazy.resolve(args)
+        return Record(kind, Levels.names.get(kind, Levels.debug), args, kwargs, caller, same_caller=same_caller)
+
+    def handle_caller(self, level=None, depth=2, kwargs=None):
+        """Count a call on the caller ``depth`` frames up and return a ``CallerSnapshot`` of it, or None if
+        it's disabled at ``level`` or rate limited. Per-call limits (``rate``, ``burst``, ``sample``, ``first``)
+        are taken out of ``kwargs``."""
+        frame = self.frames.frame(depth=depth)
+        site = self.callsites.lookup(frame.f_code, frame.f_lineno, self._caller_for, frame.f_globals)
+        caller = site.caller
+        if level is not None and not self._enabled(caller, level):
+            return None
+        if (kwargs or caller.limits) and not self._admit(site, caller.limits, kwargs):
+            return None
+
+        stack_obj = self.frames.capture(label=self.callsites.label, frame=frame)
+        caller.inc_call_count()
+        func_count = caller.log_func(site.function)
+        return caller.snapshot(site.function, func_count, stack_obj.chain, site.lineno, stack_obj.code_context,
+                               depth=self._depth.get(), filename=site.filename)
 
-        chunk = self.tools.chunk(theme.chunk)
-        filename = self.tools.color(f"{caller.name}.py", theme.label)
-        basename = self.tools.color(caller.name, theme.primary)
-        called_func = self.tools.color(caller.last_called_func, theme.tertiary)
-        call_count = self.tools.color(caller.get_func_call_count(caller.last_called_func), theme.failure)
-
-        beginning = f"{self.tracer(caller.lvl)}{chunk} {filename}  {self.tools.pointer_right}  {called_func}(): {call_count} {chunk}"
+    def __call__(self, *words, is_loop=False, loop_lvl:int=0, title:str=None, **kwargs):
+        if Levels.debug < self._floor: return
+        caller = self.handle_caller(Levels.debug, kwargs=kwargs)
+        if caller is None: return
+        kwargs.update(is_loop=is_loop, title=title)
+        self.emit(self._record("yell", words, kwargs, caller))
+
+    def __shout(self, record):
+        kwargs = dict(record.kwargs)
+        words = record.args
+        is_loop = kwargs.pop('is_loop', False)
+        title = kwargs.pop('title', None)
+
+        beginning = (self.tracer_text(record.lvl).append("|---|", theme.chunk).append(" ")
+                     .append(record.filename or f"{record.module}.py", theme.label).append("  ").append("->", "white").append("  ")
+                     .append(record.function, theme.tertiary).append("(): ").append(record.func_count, theme.failure)
+                     .append(" ").append("|---|", theme.chunk))
         end = f"\n{self.tools.div(length=self.width + len(self.indent), color=theme.tertiary)}\n"
 
-        if self._last == caller:
-            func_trace = f" {basename}.{called_func}() : {call_count}"
-            beginning = f"{self.tracer(caller.lvl)}  {chunk} {title if title else func_trace} {chunk}"
+        if record.same_caller:
+            if title:
+                func_trace = StyledText(title)
+            else:
+                func_trace = (StyledText(" ").append(record.module, theme.primary).append(".")
+                              .append(record.function, theme.tertiary).append("() : ").append(record.func_count, theme.failure))
+            beginning = (self.tracer_text(record.lvl).append("  ").append("|---|", theme.chunk).append(" ")
+                         .extend(func_trace).append(" ").append("|---|", theme.chunk))
             end = '\n'
 
         split_up = []
@@ -370,10 +940,9 @@ class Yell:
                 thing = i.split("\n")
             split_up.append(thing)
 
-        # split_up = [item for sublist in split_up for item in sublist]
-        whatever = self.__user_stuff(split_up, is_loop=is_loop, lvl=caller.lvl)
-        whatever = self.conform_width(*whatever, width=self.width)
-        whole_thing = [*whatever] if is_loop else [beginning, *whatever]
-        whole_thing = [self.wrap(t, flup_num=caller.lvl) for t in whole_thing]
-        self.be_heard(*whole_thing, sep='\n', end=end, **kwargs)
-        self._last = caller
+        limits = {name: kwargs.pop(name) for name in ("max_depth", "max_items", "max_lines") if name in kwargs}
+        whatever = self.__user_stuff(split_up, is_loop=is_loop, lvl=record.lvl, **limits)
+        whatever = (piece for line in whatever for piece in self.conform_width(line, width=self.width))
+        whole_thing = whatever if is_loop else itertools.chain([beginning], whatever)
+        whole_thing = (self.wrap(t, flup_num=record.lvl) for t in whole_thing)
+        return self.to_chunks(whole_thing, sep='\n', end=end, when=record.timestamp, **kwargs)
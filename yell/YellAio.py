@@ -0,0 +1,151 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+class YellAio:
+    """``await``-able yell calls that keep rendering and writing off the event loop.
+
+    The coroutine only captures the call (cheap, and it has to happen on the caller's
+    frame) and submits the rendering to an executor. Rendered messages go through a
+    bounded queue to a single writer task, which writes them in submission order, so
+    messages from one task always come out in the order that task sent them. When the
+    queue is full, callers wait on ``put``: that is the backpressure.
+
+    Writes go to ``stream`` (an ``asyncio.StreamWriter``) when one is set, awaiting
+    ``drain()``; otherwise they go to the destination file on a dedicated IO thread.
+    While records are being forwarded to an aggregator, recorded, written to a binary log
+    or checked for repeats, they're handed to ``Yell.emit`` like any other call instead.
+
+        await yell.aio("hello")
+        await yell.aio.info("ready")
+        await yell.aio.flush()
+    """
+
+    def __init__(self, yell, maxsize=1_000, executor=None, stream=None):
+        self.yell = yell
+        self.maxsize = maxsize
+        self.executor = executor
+        self.stream = stream
+        self._io = None
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def configure(self, maxsize=None, executor=None, stream=None):
+        """Change the queue size, render executor or output ``StreamWriter``."""
+        if maxsize is not None:
+            self.maxsize = maxsize
+            self._loop = None
+        if executor is not None:
+            self.executor = executor
+        if stream is not None:
+            self.stream = stream
+        return self
+
+    def after_fork(self):
+        """Drop executors, loop and queue inherited from the parent; they are recreated on use."""
+        self.executor = None
+        self._io = None
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    async def __call__(self, *words, is_loop=False, loop_lvl:int=0, title:str=None, **kwargs):
+        kwargs.update(is_loop=is_loop, title=title)
+        await self.submit(self.yell.capture("yell", words, kwargs))
+
+    async def success(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("success", things, kwargs))
+
+    async def warning(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("warning", things, kwargs))
+
+    async def error(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("error", things, kwargs))
+
+    async def failure(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("failure", things, kwargs))
+
+    async def info(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("info", things, kwargs))
+
+    async def debug(self, *things, width=75, **kwargs):
+        kwargs['width'] = width
+        await self.submit(self.yell.capture("debug", things, kwargs))
+
+    async def label(self, text, lvl=0, func_trace: str = None, **kwargs):
+        kwargs.update(lvl=lvl, func_trace=func_trace)
+        await self.submit(self.yell.capture("label", (text,), kwargs))
+
+    async def submit(self, record):
+        if record is None:
+            return
+        yell = self.yell
+        if yell.forward is not None or yell.recorder is not None or yell.binary_log is not None or yell.repeats is not None:
+            # records that go somewhere other than this process's output, or might be held back, take the usual way
+            yell.emit(record)
+            return
+        if yell.all_quiet:
+            return
+        queue = self._ensure_writer()
+        rendered = self._executor().submit(self.yell.render_text, record)
+        await queue.put(rendered)
+
+    async def flush(self):
+        """Wait until everything submitted so far has been written."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yell-aio")
+        return self.executor
+
+    def _ensure_writer(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = loop.create_task(self._drain(self._queue))
+        return self._queue
+
+    async def _drain(self, queue):
+        unwritten = None
+        try:
+            while True:
+                unwritten = await queue.get()
+                try:
+                    text, file, flush = await asyncio.wrap_future(unwritten)
+                    unwritten = None
+                    await self._write(text, file, flush)
+                except Exception as e:
+                    unwritten = None
+                    print(f"yell: failed to write: {e}", file=sys.stderr)
+                finally:
+                    queue.task_done()
+        except asyncio.CancelledError:
+            # the loop is shutting down: finish what was already submitted synchronously
+            pending = [unwritten] if unwritten is not None else []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            for rendered in pending:
+                try:
+                    self.yell.write(*rendered.result())
+                except Exception as e:
+                    print(f"yell: failed to write: {e}", file=sys.stderr)
+            raise
+
+    async def _write(self, text, file=None, flush=False):
+        if self.stream is not None and file is None:
+            self.stream.write(text.encode())
+            await self.stream.drain()
+            return
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yell-aio-io")
+        await asyncio.get_running_loop().run_in_executor(self._io, self.yell.write, text, file, flush)
@@ -1,40 +1,92 @@
+from collections import namedtuple
+from threading import get_ident
+
+from .Levels import Levels
+
+
+class CallerSnapshot(namedtuple("CallerSnapshot", "caller name lvl function func_count stack lineno code_context filename")):
+    """One call as its ``YellCaller`` saw it, taken on the calling thread.
+
+    ``handle_caller`` returns this instead of writing the call's function, stack and line
+    onto the shared ``YellCaller``, so a call on another thread can't change what this
+    one's ``Record`` says.
+    """
+    __slots__ = ()
+
+
+class _Shard:
+    """One thread's share of a caller's counters. Only that thread ever writes to it."""
+    __slots__ = ("calls", "funcs")
+
+    def __init__(self):
+        self.calls = 0
+        self.funcs = {}
+
 
 class YellCaller:
+    """Settings and call counts for one module.
+
+    Counting is spread over one shard per thread, so threads never do a read-modify-write
+    on the same number and no lock is needed; reading a count adds the shards up.
+    """
+    # what a ``modules`` entry in the config can set
+    settings = ("on", "lvl", "level", "rate", "burst", "sample", "first")
 
-    def __init__(self, name, on=True, lvl=1):
+    def __init__(self, name, on=True, lvl=1, level=None, rate=None, burst=None, sample=None, first=None):
         self.name = name
+        self.configure(on=on, lvl=lvl, level=level, rate=rate, burst=burst, sample=sample, first=first)
+        # thread id -> _Shard
+        self._shards = {}
+
+    def configure(self, on=True, lvl=1, level=None, rate=None, burst=None, sample=None, first=None):
+        """Replace the settings, keeping the counts."""
         self.on = on
         self.lvl = lvl
-        self.func_registry = {}
-        self.call_count = 0
-        self.last_called_func = None
-        self.last_stack = []
-        self.code_context = None
-        self.lineno = None
+        self.level = Levels.to_level(level)
+        # rate limits for every call site in the module, see RateLimit
+        limits = dict(rate=rate, burst=burst, sample=sample, first=first)
+        self.limits = {key: value for key, value in limits.items() if value is not None} or None
 
-    def set_last_stack(self, stack_stuff):
-        self.last_stack = stack_stuff
+    def _shard(self) -> _Shard:
+        ident = get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, _Shard())
+        return shard
 
     def log_func(self, func_name):
+        """Count a call from ``func_name`` and return how many there have been, over all threads."""
         if not self.on:
             return None
-        caller = func_name
-        caller_count = self.func_registry.get(caller)
-        if caller_count is None:
-            self.func_registry[caller] = 1
-        elif caller_count >= 1:
-            self.func_registry[caller] = caller_count + 1
-        self.set_last_called_func(func_name)
-        return self.func_registry[caller]
+        funcs = self._shard().funcs
+        funcs[func_name] = funcs.get(func_name, 0) + 1
+        return self.get_func_call_count(func_name)
 
     def inc_call_count(self):
-        self.call_count += 1
+        self._shard().calls += 1
+
+    @property
+    def call_count(self):
+        return sum(shard.calls for shard in list(self._shards.values()))
+
+    @property
+    def func_registry(self) -> dict:
+        """Calls per function, over all threads."""
+        counts = {}
+        for shard in list(self._shards.values()):
+            for func_name, count in list(shard.funcs.items()):
+                counts[func_name] = counts.get(func_name, 0) + count
+        return counts
 
     def get_module_call_count(self):
         return self.call_count
 
     def get_func_call_count(self, func_name):
-        return self.func_registry.get(func_name)
+        count = sum(shard.funcs.get(func_name, 0) for shard in list(self._shards.values()))
+        return count or None
 
-    def set_last_called_func(self, func_name):
-        self.last_called_func = func_name
+    def snapshot(self, function, func_count, stack, lineno, code_context, depth=0, filename=None) -> CallerSnapshot:
+        """``depth`` is how far ``yell.nested()`` blocks have pushed this call in; ``filename``
+        is the base name of the file the call is in."""
+        return CallerSnapshot(self, self.name, self.lvl + depth, function, func_count, stack, lineno, code_context,
+                              filename)
@@ -0,0 +1,64 @@
+"""Command line tools.
+
+    python -m yell render app.yellbin --level warning --module "app.*"
+
+replays a file written by ``yell.enable_binary_log()`` through the same renderers a live
+call would have used.
+"""
+import argparse
+import fnmatch
+import sys
+
+from . import yell
+from .BinaryLog import BinaryLog
+from .Levels import Levels
+from .ModuleRules import ModuleRules
+
+
+def render(options):
+    level = options.level
+    level = Levels.to_level(int(level) if level and level.isdigit() else level)
+    # a yell_config.py that logs to a binary file would otherwise swallow the replay
+    yell.disable_binary_log()
+    if options.json:
+        yell.format = "json"
+    # the same matching as the "modules" config, so "utils" also finds pkg.utils
+    modules = None
+    if options.module:
+        modules = ModuleRules()
+        modules.add(options.module, {})
+    for record in BinaryLog.read(options.file):
+        if level is not None and record.level < level:
+            continue
+        if modules is not None and modules.match(record.module) is None:
+            continue
+        if options.func and not fnmatch.fnmatchcase(record.function, options.func):
+            continue
+        record.kwargs.pop("flush", None)
+        yell.render(record)
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m yell")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay = commands.add_parser("render", help="render a binary log written by yell.enable_binary_log()")
+    replay.add_argument("file")
+    replay.add_argument("--level", help="minimum level, a name like 'warning' or a number")
+    replay.add_argument("--module", help="only records from modules matching this name or pattern, as in the modules config, "
+                                             "e.g. 'myapp.db.*'")
+    replay.add_argument("--func", help="only records from functions matching this glob")
+    replay.add_argument("--json", action="store_true", help="write JSON Lines instead of boxes and trees")
+    options = parser.parse_args(argv)
+    try:
+        if options.command == "render":
+            render(options)
+    except BrokenPipeError:
+        # piped into head or less and the reader went away
+        sys.stderr.close()
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"yell: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
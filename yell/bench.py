@@ -0,0 +1,620 @@
+"""Micro-benchmarks for yell's hot paths.
+
+Run with ``python -m yell.bench``. ``--suite`` runs only the regression suite, a short
+timing of every hot path; ``--save FILE`` stores its results as a baseline and
+``--baseline FILE`` compares against one, exiting with status 1 if any path got slower
+by more than ``--threshold`` percent. The thread stress check, ``bench_threads``, runs every
+time, and exits with status 1 if it fails.
+"""
+import argparse
+import gc
+import json
+import logging
+import io
+import sys
+import time
+import inspect
+import re
+import subprocess
+import threading
+import os
+import tempfile
+import textwrap
+import tracemalloc
+
+from .FrameCapture import FrameCapture
+from .Callsite import CallsiteTable
+from .ModuleRules import ModuleRules
+from .Yell import Yell
+from .ColorText import ColorText
+from .AnsiColors import AnsiColors
+from .AnsiWrap import AnsiWrap
+from .JsonLines import JsonLines
+from .BinaryLog import BinaryLog
+
+
+def _per_call_ns(func, number):
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return (time.perf_counter_ns() - start) / number
+
+
+def _at_depth(depth, func):
+    """Call ``func`` with roughly ``depth`` frames on the stack."""
+    if depth <= 0:
+        return func()
+    return _at_depth(depth - 1, func)
+
+
+def _report(title, rows):
+    print(title)
+    for name, ns in rows:
+        print(f"  {name:<40} {ns / 1000:>12.2f} us")
+
+
+def bench_frame_capture(depths=(10, 100, 1000), number=200):
+    """``inspect.stack()`` + ``getouterframes`` versus ``FrameCapture`` at several depths."""
+    def with_inspect():
+        stack_obj = inspect.stack()[1]
+        return [f.function for f in inspect.getouterframes(stack_obj.frame)]
+
+    walker = FrameCapture()
+    source_walker = FrameCapture(with_source=True)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, max(depths) + 200))
+    results = {}
+    try:
+        for depth in depths:
+            runs = max(1, number // max(1, depth // 10))
+            rows = [
+                ("inspect.stack()", _at_depth(depth, lambda: _per_call_ns(with_inspect, runs))),
+                ("FrameCapture", _at_depth(depth, lambda: _per_call_ns(walker.capture, runs))),
+                ("FrameCapture(with_source=True)",
+                 _at_depth(depth, lambda: _per_call_ns(source_walker.capture, runs))),
+            ]
+            results[depth] = dict(rows)
+            _report(f"frame capture @ depth {depth}", rows)
+    finally:
+        sys.setrecursionlimit(limit)
+    return results
+
+
+def bench_callsite_cache(number=100_000):
+    """``handle_caller`` from one hot call site, with and without the interned table."""
+    yell = Yell()
+
+    def from_a_hot_loop():
+        return yell.handle_caller()
+
+    def cold():
+        yell.callsites.clear()
+        return yell.handle_caller()
+
+    def from_a_cold_loop():
+        return cold()
+
+    yell.callsites = CallsiteTable()
+    hot = _per_call_ns(from_a_hot_loop, number)
+    info = yell.cache_info()
+    rows = [
+        ("handle_caller (interned)", hot),
+        ("handle_caller (cleared every call)", _per_call_ns(from_a_cold_loop, number)),
+    ]
+    _report("callsite cache", rows)
+    print(f"  {info}")
+    return dict(rows)
+
+
+def bench_module_rules(rules=500, number=100_000):
+    """``handle_caller`` with hundreds of module rules, and the cost of matching one module name."""
+    patterns = [f"app{i}.db.*" for i in range(rules // 2)] + [f"app{i}.*.models" for i in range(rules // 2)]
+    many = ModuleRules()
+    for pattern in patterns:
+        many.add(pattern, {"level": "warning"})
+    many.add("yell.bench", {"level": "debug"})
+
+    rows = []
+    for label, table in (("no rules", ModuleRules()), (f"{len(many)} rules", many)):
+        yell = Yell()
+        yell._configure()
+        # instance copies, so the shared registry and rules are left alone
+        yell._registry = {}
+        yell._rules = table
+
+        def from_a_hot_loop():
+            return yell.handle_caller()
+
+        rows.append((f"handle_caller ({label})", _per_call_ns(from_a_hot_loop, number)))
+
+    names = [f"app{i % (rules // 2)}.api.models" for i in range(1_000)]
+
+    def match_uncached():
+        many._matches.clear()
+        for name in names:
+            many.match(name)
+
+    rows.append((f"match a new module name ({len(many)} rules)", _per_call_ns(match_uncached, 10) / len(names)))
+    _report("module rules", rows)
+    return dict(rows)
+
+
+def bench_disabled_path(number=1_000_000):
+    """Cost of a ``yell.debug`` call that is filtered out, next to an empty function call."""
+    yell = Yell()
+
+    def empty(*args):
+        return None
+
+    def globally_off():
+        yell.debug("never rendered", 42)
+
+    def module_off():
+        yell.debug("never rendered", 42)
+
+    def baseline():
+        empty("never rendered", 42)
+
+    yell.level = "warning"
+    rows = [("empty function call", _per_call_ns(baseline, number)),
+            ("debug below the global level", _per_call_ns(globally_off, number))]
+    yell.level = "all"
+    yell.set_level("warning", module=CallsiteTable.module_name(module_off.__code__, module_off.__globals__))
+    rows.append(("debug below its module's level", _per_call_ns(module_off, number)))
+    yell.all_quiet = True
+    rows.append(("debug with all_quiet", _per_call_ns(globally_off, number)))
+    # module callers are shared by every Yell, so the later benchmarks would stay filtered otherwise
+    yell.set_level(None, module=CallsiteTable.module_name(module_off.__code__, module_off.__globals__))
+    _report("disabled calls", rows)
+    return dict(rows)
+
+
+def bench_lazy_args(number=200_000):
+    """A disabled ``yell.debug`` with an expensive argument, built eagerly, with a lambda and with ``yell.lazy``."""
+    yell = Yell()
+    state = {"user": {"id": 42, "roles": ["admin", "dev"]}, "items": list(range(20))}
+
+    def eager():
+        yell.debug("state", repr(state))
+
+    def with_lambda():
+        yell.debug("state", lambda: repr(state))
+
+    def with_lazy():
+        yell.debug("state", yell.lazy(repr, state))
+
+    yell.level = "warning"
+    rows = [("eager argument", _per_call_ns(eager, number)),
+            ("lambda argument", _per_call_ns(with_lambda, number)),
+            ("yell.lazy argument", _per_call_ns(with_lazy, number))]
+    _report("disabled calls with an expensive argument", rows)
+    return dict(rows)
+
+
+def bench_timed(number=200_000):
+    """Overhead of ``@yell.timed`` on an empty function when its line isn't drawn."""
+    yell = Yell()
+    yell.level = "info"
+
+    def empty():
+        return None
+
+    hidden = yell.timed(empty)
+    quiet = yell.timed(empty, show=False)
+    rows = [("empty function call", _per_call_ns(empty, number)),
+            ("@timed, below the level", _per_call_ns(hidden, number)),
+            ("@timed(show=False)", _per_call_ns(quiet, number))]
+    _report("timing spans", rows)
+    return dict(rows)
+
+
+def _sample_message(yell):
+    """Capture one boxed message and one tree message to render repeatedly."""
+    payload = {"user": {"id": 42, "name": "zak", "roles": ["admin", "dev"]},
+               "items": [1, 2.5, None, True, "text"], "empty": {}}
+
+    def call_site():
+        return (yell.capture("info", ("request handled", payload), {"width": 75}),
+                yell.capture("yell", ("request handled", payload), {}))
+
+    return call_site()
+
+
+def _count_instances(cls):
+    """Wrap ``cls.__init__`` to count instances created until the returned stop() is called."""
+    original = cls.__init__
+    counter = [0]
+
+    def counting_init(self, *args, **kwargs):
+        counter[0] += 1
+        original(self, *args, **kwargs)
+
+    cls.__init__ = counting_init
+
+    def stop():
+        cls.__init__ = original
+        return counter[0]
+
+    return stop
+
+
+def bench_render_message(number=2_000):
+    """Time, peak memory and color objects created per rendered message."""
+    yell = Yell()
+    records = _sample_message(yell)
+
+    def render():
+        for record in records:
+            yell.render_text(record)
+
+    per_message = _per_call_ns(render, number) / len(records)
+    stop_text, stop_ansi = _count_instances(ColorText), _count_instances(AnsiColors)
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    texts, ansis = stop_text(), stop_ansi()
+    _report("rendering", [("per message", per_message)])
+    print(f"  {'ColorText objects per message':<40} {texts / len(records):>12.1f}")
+    print(f"  {'AnsiColors objects per message':<40} {ansis / len(records):>12.1f}")
+    print(f"  {'peak traced memory per message':<40} {peak / len(records) / 1024:>12.1f} KiB")
+    return {"per_message": per_message, "color_text": texts / len(records), "ansi_colors": ansis / len(records)}
+
+
+def bench_self_stats(number=1_000):
+    """A captured and rendered message with ``enable_stats()`` off and on, and the phases it reports."""
+    yell = Yell()
+    out = io.StringIO()
+
+    def message():
+        yell.info("request handled", {"status": 200}, file=out)
+        yell({"user": {"id": 42, "roles": ["admin", "dev"]}}, file=out)
+        out.seek(0)
+        out.truncate()
+
+    rows = [("stats off", _per_call_ns(message, number) / 2)]
+    yell.enable_stats()
+    rows.append(("stats on", _per_call_ns(message, number) / 2))
+    phases = yell.stats()
+    yell.disable_stats()
+    _report("self-instrumentation (per message)", rows)
+    for phase, numbers in phases.items():
+        print(f"  {phase:<40} {numbers['share']:>12.0%}")
+    return {**dict(rows), "phases": phases}
+
+
+def _long_line(size):
+    """A line of about ``size`` characters: words, some colored, a few wide characters."""
+    words = ["request", "\033[93mhandled\033[0m", "in", "\033[1;32m12ms\033[0m", "日本語", "ok"]
+    line = " ".join(words)
+    return (line + " ") * (size // (len(line) + 1) + 1)
+
+
+def bench_wrap(sizes=(10_000, 1_000_000, 10_000_000), width=80):
+    """Wrapping and truncating very long lines, next to ``textwrap`` on the same text without escapes."""
+    wrapper = AnsiWrap()
+    results = {}
+    for size in sizes:
+        line = _long_line(size)
+        plain = line.replace("\033[93m", "").replace("\033[1;32m", "").replace("\033[0m", "")
+        runs = max(1, 1_000_000 // size)
+        rows = [
+            ("AnsiWrap.wrap", _per_call_ns(lambda: wrapper.wrap(line, width, subsequent_indent=" ↪ "), runs)),
+            ("AnsiWrap.truncate", _per_call_ns(lambda: wrapper.truncate(line, width), runs)),
+            ("textwrap.wrap (no escapes)",
+             _per_call_ns(lambda: textwrap.wrap(plain, width, subsequent_indent=" ↪ "), runs)),
+        ]
+        results[size] = dict(rows)
+        _report(f"wrapping a {size:,} character line", rows)
+    return results
+
+
+def bench_tree(size=200_000, depth=1_000):
+    """Time to the first written chunk and in total for a long list and a deeply nested dict."""
+    yell = Yell()
+    nested = leaf = {}
+    for _ in range(depth):
+        leaf["next"] = leaf = {}
+    payloads = [("list", list(range(size))), ("nested", nested)]
+    results = {}
+    for limited in (True, False):
+        limits = {} if limited else {"max_depth": None, "max_items": None, "max_lines": None}
+        for name, payload in payloads:
+            record = yell.capture("yell", (payload,), limits)
+            start = time.perf_counter_ns()
+            chunks, _, _ = yell.render_chunks(record)
+            lines = next(chunks).count("\n")
+            first = time.perf_counter_ns() - start
+            lines += sum(chunk.count("\n") for chunk in chunks)
+            total = time.perf_counter_ns() - start
+            label = f"{name} ({'default limits' if limited else 'no limits'}, {lines:,} lines)"
+            results[label] = {"first_chunk": first, "total": total}
+            _report(label, [("first chunk", first), ("whole tree", total)])
+    return results
+
+
+def bench_json(number=2_000):
+    """Records per second through ``render_text`` in pretty mode and in JSON Lines mode."""
+    yell = Yell()
+    records = _sample_message(yell)
+
+    def render():
+        for record in records:
+            yell.render_text(record)
+
+    rows = [("pretty", _per_call_ns(render, number) / len(records))]
+    for use_orjson in (True, False):
+        yell.json = JsonLines(use_orjson=use_orjson)
+        rows.append((f"json ({yell.json.encoder})", _per_call_ns(render, number) / len(records)))
+    yell.json = None
+    _report("JSON Lines throughput (per record)", rows)
+    for name, ns in rows:
+        print(f"  {name:<40} {1e9 / ns:>12,.0f} records/s")
+    return dict(rows)
+
+
+def bench_binary_log(number=2_000):
+    """Cost of a record written to a binary log, next to rendering it, and the file size per record."""
+    yell = Yell()
+    records = _sample_message(yell)
+
+    def render():
+        for record in records:
+            yell.render_text(record)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.yellbin")
+        binary_log = BinaryLog(path)
+
+        def write():
+            for record in records:
+                binary_log.write(record)
+
+        rows = [
+            ("render_text", _per_call_ns(render, number) / len(records)),
+            ("BinaryLog.write", _per_call_ns(write, number) / len(records)),
+        ]
+        binary_log.close()
+        size = os.path.getsize(path) / binary_log.written
+        start = time.perf_counter_ns()
+        count = sum(1 for _ in BinaryLog.read(path))
+        rows.append(("BinaryLog.read", (time.perf_counter_ns() - start) / count))
+    _report("binary log (per record)", rows)
+    print(f"  {'bytes per record':<40} {size:>12.1f}")
+    return {**dict(rows), "bytes": size}
+
+
+def bench_threads(threads=64, calls=200):
+    """Stress check: ``threads`` threads yelling at once must keep exact counts and never tear a message.
+
+    Each message is a box of a known shape; the output is read back and every message
+    must come out whole, with every thread's messages present exactly once.
+    """
+    yell = Yell()
+    yell.width = 40
+    interval = sys.getswitchinterval()
+    start = threading.Barrier(threads)
+
+    def worker(n):
+        start.wait()
+        for i in range(calls):
+            yell.info(f"thread {n} message {i}", file=out)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "threads.log")
+        with open(path, "w") as out:
+            sys.setswitchinterval(1e-6)
+            try:
+                began = time.perf_counter_ns()
+                pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+                for thread in pool:
+                    thread.start()
+                for thread in pool:
+                    thread.join()
+                elapsed = time.perf_counter_ns() - began
+            finally:
+                sys.setswitchinterval(interval)
+        with open(path) as written:
+            text = re.sub(r"\033\[[0-9;]*m", "", written.read())
+
+    expected = threads * calls
+    caller = yell._caller_for(CallsiteTable.module_name(worker.__code__, worker.__globals__))
+    message = re.compile(r"\[[^\n]*\]\n(?:[^\n╭]*\n)*?[^\n]*╭-+╮\n[^\n]*\|thread (\d+) message (\d+) *\|\n[^\n]*╰-+╯\n")
+    seen = [match.groups() for match in message.finditer(text)]
+    whole = len(seen) == expected and sum(len(match.group(0)) for match in message.finditer(text)) == len(text)
+    problems = []
+    if caller.get_func_call_count("worker") != expected:
+        problems.append(f"counted {caller.get_func_call_count('worker'):,} calls")
+    if not whole:
+        problems.append("torn or missing messages")
+    if len(set(seen)) != expected:
+        problems.append(f"{expected - len(set(seen)):,} messages lost")
+    _report(f"{threads} threads x {calls} messages", [("per message", elapsed / expected)])
+    print(f"  {'result':<40} {'ok' if not problems else ', '.join(problems):>12}")
+    return {"per_message": elapsed / expected, "ok": not problems}
+
+
+class _NullSink:
+    """A file that throws everything away, so end-to-end timings leave the terminal out."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _suite_cases():
+    """``(name, func, operations per call)`` for every path the regression suite times."""
+    yell = Yell()
+    null = _NullSink()
+    payload = {"user": {"id": 42, "name": "zak", "roles": ["admin", "dev"]}, "items": [1, 2.5, None, True, "text"]}
+    wide = {f"key {i}": i for i in range(2_000)}
+    deep = leaf = []
+    for _ in range(200):
+        leaf.append(leaf := [])
+    colored = _long_line(200)
+    long_line = _long_line(10_000)
+    records = _sample_message(yell)
+
+    def handle_caller_at(depth):
+        return lambda: _at_depth(depth, lambda: [yell.handle_caller() for _ in range(100)])
+
+    def tree(value):
+        return lambda: sum(1 for _ in yell._Yell__user_stuff([value]))
+
+    def end_to_end():
+        yell(payload, file=null)
+
+    def info():
+        yell.info("request handled", payload, file=null)
+
+    logger = logging.getLogger("yell.bench")
+    logger.propagate = False
+    handler = logging.StreamHandler(null)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(module)s:%(funcName)s:%(lineno)d %(message)s"))
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+
+    def stdlib_logging():
+        logger.info("request handled %s", payload)
+
+    return [
+        ("handle_caller @ depth 10", handle_caller_at(10), 100),
+        ("handle_caller @ depth 100", handle_caller_at(100), 100),
+        ("ColorText() and str()", lambda: str(ColorText("request handled", "bright_green")), 1),
+        ("ColorText.find_length, 200 chars", lambda: ColorText.find_length(colored), 1),
+        ("tree, 2,000-key dict", tree(wide), 1),
+        ("tree, 200-deep list", tree(deep), 1),
+        ("box (__log) render", lambda: yell.render_text(records[0]), 1),
+        ("conform_width, 10,000-char ANSI line", lambda: yell.conform_width(long_line), 1),
+        ("yell() to a null sink", end_to_end, 1),
+        ("yell.info() to a null sink", info, 1),
+        ("stdlib logging.info() to a null sink", stdlib_logging, 1),
+    ]
+
+
+# imported on demand by the features that need them, never by ``import yell``
+DEFERRED_MODULES = ("asyncio", "multiprocessing", "concurrent.futures", "inspect", "typing", "json",
+                    "signal", "mmap", "pickle", "linecache", "random", "numbers", "yell_config")
+
+
+# most milliseconds `import yell` may take, in a fresh interpreter with a warm bytecode cache
+IMPORT_BUDGET_MS = 50.0
+
+
+def import_time(repeat=5) -> tuple:
+    """Best ``python -X importtime`` nanoseconds for ``import yell`` in a fresh interpreter, and
+    which of ``DEFERRED_MODULES`` it loaded anyway.
+
+    The first run writes the bytecode cache, so the timed runs measure a normal start.
+    """
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package, os.environ.get("PYTHONPATH")]))}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    check = f"import sys, yell; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    # from an empty directory, so a yell_config.py in the working directory doesn't count
+    with tempfile.TemporaryDirectory() as directory:
+        loaded = subprocess.run([sys.executable, "-c", check], env=env, cwd=directory,
+                                capture_output=True, text=True, check=True).stdout.split()
+        best = None
+        for _ in range(repeat):
+            report = subprocess.run([sys.executable, "-X", "importtime", "-c", "import yell"], env=env, cwd=directory,
+                                    capture_output=True, text=True, check=True).stderr
+            cumulative = int(re.search(r"^import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*yell$", report, re.M).group(1))
+            best = cumulative if best is None else min(best, cumulative)
+    return best * 1_000, loaded
+
+
+def run_suite(budget_ns=500_000_000, repeat=5) -> dict:
+    """Nanoseconds per operation for every suite case, the best of ``repeat`` runs.
+
+    Each run is sized to take about ``budget_ns / repeat``.
+    """
+    results = {}
+    collecting = gc.isenabled()
+    gc.disable()  # like timeit, so a collection doesn't land on whichever case happens to be running
+    try:
+        for name, func, operations in _suite_cases():
+            once = _per_call_ns(func, 1)
+            number = max(1, int(budget_ns / repeat / max(once, 1)))
+            best = min(_per_call_ns(func, number) for _ in range(repeat))
+            results[name] = best / operations
+    finally:
+        if collecting:
+            gc.enable()
+    results["import yell"], _ = import_time()
+    return results
+
+
+def compare(results, baseline, threshold=25.0) -> list:
+    """Names of the cases in ``results`` that are more than ``threshold`` percent slower than ``baseline``."""
+    print(f"{'regression suite':<40} {'now':>12} {'baseline':>12} {'change':>8}")
+    regressions = []
+    for name, ns in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<38} {ns / 1000:>9.2f} us {'-':>12} {'new':>8}")
+            continue
+        change = (ns - before) / before * 100
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<38} {ns / 1000:>9.2f} us {before / 1000:>9.2f} us {change:>+7.0f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m yell.bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--suite", action="store_true", help="only run the regression suite")
+    parser.add_argument("--save", metavar="FILE", help="write the suite's results to FILE as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare the suite's results with FILE")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="percent slower than the baseline that counts as a regression (default 25)")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, metavar="MS",
+                        help=f"most milliseconds `import yell` may take (default {IMPORT_BUDGET_MS:g})")
+    options = parser.parse_args(argv)
+    if not (options.suite or options.save or options.baseline):
+        run_all()
+    results = run_suite()
+    baseline = {}
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, options.threshold)
+    if not bench_threads()["ok"]:
+        regressions.append("thread safety")
+    _, loaded = import_time(repeat=1)
+    if loaded:
+        print(f"`import yell` loaded modules it should defer: {', '.join(loaded)}")
+        regressions.append("deferred imports")
+    if results["import yell"] > options.import_budget * 1_000_000:
+        print(f"`import yell` took {results['import yell'] / 1e6:.1f} ms, over the {options.import_budget:g} ms budget")
+        regressions.append("import budget")
+    if options.save:
+        with open(options.save, "w") as file:
+            json.dump({"python": sys.version.split()[0], "results": results}, file, indent=2)
+    if regressions:
+        print(f"{len(regressions)} check(s) failed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def run_all():
+    bench_frame_capture()
+    bench_callsite_cache()
+    bench_module_rules()
+    bench_disabled_path()
+    bench_lazy_args()
+    bench_timed()
+    bench_render_message()
+    bench_self_stats()
+    bench_wrap()
+    bench_tree()
+    bench_json()
+    bench_binary_log()
+
+
+if __name__ == "__main__":
+    sys.exit(main())